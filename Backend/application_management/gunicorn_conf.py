@@ -0,0 +1,67 @@
+"""
+Gunicorn configuration for production.
+
+The application is loaded and warmed once in the master process
+(``preload_app``) and then forked, so workers start ready to serve and
+share the loaded code and position cache copy-on-write. Database
+connections are opened by the request threads themselves and kept open
+between requests (``CONN_MAX_AGE`` in the API settings profile).
+
+Used by ``application_management.serve``, or directly with:
+
+    gunicorn -c python:application_management.gunicorn_conf application_management.wsgi
+
+Every setting can be overridden with the environment variable in brackets.
+"""
+
+import os
+
+
+def cpu_count():
+    """
+    CPUs this process may run on, which respects container CPU sets
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Address to listen on (GUNICORN_BIND)
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# One process per CPU plus one (GUNICORN_WORKERS). Requests mostly wait on
+# the database, so each worker also runs a few threads (GUNICORN_THREADS).
+workers = int(os.environ.get('GUNICORN_WORKERS', cpu_count() + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Load and warm the application once, before forking
+preload_app = True
+
+# Recycle workers now and then to bound memory growth (GUNICORN_MAX_REQUESTS)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    """
+    Runs in the master after the application is loaded, before any worker
+    is forked
+    """
+    from django.db import connections
+
+    from application_management.warmup import warm_application, warm_database
+
+    timings = {**warm_application(server.app.wsgi()), **warm_database()}
+    server.log.info("Application warmed in %.0f ms %s", sum(timings.values()), timings)
+
+    # Connections must not be shared with the forked workers
+    connections.close_all()
+
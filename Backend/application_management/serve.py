@@ -0,0 +1,34 @@
+"""
+Production launcher: runs Gunicorn with ``application_management.gunicorn_conf``.
+
+    python -m application_management.serve [extra gunicorn options]
+
+DJANGO_SETTINGS_MODULE selects the settings profile as usual. It defaults
+to ``application_management.settings_api``, not to the development
+settings with DEBUG on and a new database connection per request.
+"""
+
+import os
+import sys
+
+CONFIG = 'python:application_management.gunicorn_conf'
+SETTINGS_MODULE = 'application_management.settings_api'
+APPLICATION = 'application_management.wsgi:application'
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS_MODULE)
+
+    # Only production servers need Gunicorn, and it does not run on Windows
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        sys.exit("Gunicorn is not installed: pip install -r requirements.txt")
+
+    argv = sys.argv[1:] if argv is None else argv
+    sys.argv = ['gunicorn', '-c', CONFIG, *argv, APPLICATION]
+    run()
+
+
+if __name__ == '__main__':
+    main()
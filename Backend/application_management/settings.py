@@ -57,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'candidates.throttling.RateLimitHeadersMiddleware',
 ]
 
 ROOT_URLCONF = 'application_management.urls'
@@ -147,8 +148,83 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'candidates.throttling.ActionRateThrottle',
+    ],
+    # Reverse proxies in front of the app. Anonymous and login budgets are
+    # keyed on the client IP, which is only read from X-Forwarded-For when
+    # it was added by one of these; with 0 REMOTE_ADDR is used as is.
+    'NUM_PROXIES': 0,
+    # Token bucket budgets per user and scope (see candidates/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'read': '600/min',     # Lists, searches and detail views
+        'write': '120/min',    # Create, update, delete and status changes
+        'bulk': '10/min',      # Bulk status and import
+        'batch': '600/min',    # /api/batch/, one token per GET sub-request
+        'export': '5/min',
+        'login': '10/min',     # Per client IP
+    },
+}
+
+# Request throttling backend (see candidates/throttling.py)
+THROTTLING = {
+    'ENABLED': True,
+    'BACKEND': 'local',       # 'local' per process, or 'cache' shared through CACHES
+    'CACHE_ALIAS': 'default',
+}
+
+
+# Duplicate applicant detection (see candidates/duplicates.py)
+DUPLICATE_DETECTION = {
+    'THRESHOLD': 0.6,           # Minimum pair score reported as a duplicate
+    'LATENCY_BUDGET_MS': 50,    # Time budget for the check on candidate create
+    'MAX_BLOCK_SIZE': 500,      # Larger blocks are skipped as junk data
+}
+# Seconds before the in-process position name cache is reloaded
+POSITION_CACHE_TIMEOUT = 300
+
+# Batch reads and the /api/batch/ endpoint (see candidates/batch.py)
+BATCH_REQUESTS = {
+    'MAX_IDS': 100,       # Ids accepted by GET /api/candidates/?ids=
+    'MAX_REQUESTS': 20,   # Sub-requests accepted by POST /api/batch/
+    'MAX_THREADS': 4,     # Threads used for parallel GET sub-requests
+}
+
+# Seconds facet counts are cached per search/filter combination
+FACETS_CACHE_TIMEOUT = 5
+
+# Identical concurrent list/detail requests share one result (see candidates/singleflight.py)
+SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'TIMEOUT': 5.0,   # Seconds a request waits for the shared result before querying itself
 }
 
+# Columnar snapshot behind /api/candidates/analytics/ (see candidates/analytics.py)
+ANALYTICS = {
+    'REFRESH_INTERVAL': 5,     # Seconds a snapshot is used before changes are applied
+    'RECONCILE_INTERVAL': 60,  # Seconds between full id checks for deleted and late committed rows
+    'REBUILD_INTERVAL': 3600,  # Seconds before the snapshot is rebuilt from scratch
+    'PATH': None,              # Directory to share the snapshot between workers through mmap'd files
+}
+
+
+# Background jobs (see candidates/jobs.py and the run_workers command)
+JOBS = {
+    'RETRY_DELAY_SECONDS': 30,       # Doubled after every failed attempt
+    'STALE_AFTER_SECONDS': 600,      # Running jobs without a heartbeat for this long are requeued
+    'HEARTBEAT_SECONDS': 60,         # How often workers refresh the lock of the job they run
+    'PROGRESS_INTERVAL_SECONDS': 0.5,
+    'MAX_ERROR_BACKOFF_SECONDS': 60,  # Longest wait of a worker after database errors
+}
+
+# Files written by export jobs
+EXPORT_ROOT = BASE_DIR / 'exports'
+
+# Django admin on large candidate tables (see candidates/admin.py)
+ADMIN_LARGE_TABLES = {
+    'THRESHOLD': 100000,          # Estimated rows before the admin switches to large table mode
+    'MAX_EXPORT_ROWS': 100000,    # Rows the export action accepts in one job
+}
 
 
 # CORS Configuration - Allow Angular app to make requests
@@ -0,0 +1,26 @@
+"""
+Settings profile for load testing the API profile.
+
+Identical to ``settings_api`` except that logins are not throttled. The
+``loadtest`` command logs every virtual user in from the same address,
+which the per-IP login budget would otherwise hold back to a handful of
+users. All other budgets apply as in production.
+
+``DEBUG`` stays on: the ``loadtest`` command recognises "database is
+locked" errors from the traceback in the 500 response.
+
+    DJANGO_SETTINGS_MODULE=application_management.settings_loadtest python manage.py runserver
+"""
+
+from .settings_api import *  # noqa: F401,F403
+from .settings_api import REST_FRAMEWORK
+
+DEBUG = True
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {
+        **REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+        'login': None,
+    },
+}
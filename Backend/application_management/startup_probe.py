@@ -0,0 +1,281 @@
+"""
+Measures the startup cost and per-request overhead of a settings profile.
+
+Import time can only be measured once per interpreter, so the ``startup``
+and ``middleware`` benchmark suites run this module in fresh processes:
+
+    DJANGO_SETTINGS_MODULE=application_management.settings_api \
+        python -m application_management.startup_probe --requests 200
+
+The first request is an authenticated candidate list, so it opens the
+database connection, checks the token and fills the position cache like
+the first request of a new worker. It needs a database prepared once with
+
+    python -m application_management.startup_probe --prepare /tmp/probe.sqlite3
+
+whose printed token is passed on to the timed runs with ``--database`` and
+``--token``. Without them the first request is sent unauthenticated.
+
+``--warm`` runs the production warm up (see ``warmup.py``) before the first
+request. ``--fork`` serves authenticated requests from a thread of a forked
+child, like a gthread worker of the preloading production server, and
+reports the child's memory.
+
+Prints the measurements as a single JSON object.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def rss_mb():
+    """
+    Resident memory of this process in MB
+    """
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # Peak RSS is the best available measure off Linux
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def private_mb():
+    """
+    Memory only this process uses, i.e. not shared copy-on-write with its
+    parent, in MB. None where /proc/self/smaps_rollup is not available.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as smaps_file:
+            private_kb = sum(
+                int(line.split()[1]) for line in smaps_file
+                if line.startswith(('Private_Clean:', 'Private_Dirty:'))
+            )
+    except OSError:
+        return None
+    return private_kb / 1024
+
+
+def make_environ(path, token=None):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.url_scheme': 'http',
+    }
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Token {token}'
+    return environ
+
+
+def call(application, environ):
+    """
+    Send one request through a WSGI application, returns (status, ms)
+    """
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return statuses[0], (time.perf_counter() - started) * 1000
+
+
+def use_database(path):
+    """
+    Point the default database at ``path``. Must run before the first
+    connection is opened.
+    """
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = path
+
+
+def prepare_database(path):
+    """
+    Create, migrate and seed the database used by the first request of the
+    timed runs, returns the token of its user
+    """
+    import django
+    from django.core.management import call_command
+
+    use_database(path)
+    django.setup()
+
+    from candidates.benchmarks import bench_user, seed_candidates
+
+    call_command('migrate', verbosity=0, interactive=False)
+    seed_candidates(1000)
+    _, token = bench_user()
+    return token
+
+
+def measure_requests(application, count):
+    """
+    Time an authenticated list request through the full WSGI handler and
+    through the view alone. The difference is the middleware and handler
+    overhead of the profile.
+    """
+    from django.core.handlers.wsgi import WSGIRequest
+    from django.db import connection
+    from django.urls import resolve
+
+    from candidates.benchmarks import bench_user, seed_candidates
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    seed_candidates(1000)
+    _, token = bench_user()
+
+    path = '/api/candidates/'
+    view = resolve(path).func
+    handler_ms = []
+    view_ms = []
+
+    for number in range(count + 10):
+        _, elapsed = call(application, make_environ(path, token))
+
+        request = WSGIRequest(make_environ(path, token))
+        started = time.perf_counter()
+        view(request).render()
+        direct = (time.perf_counter() - started) * 1000
+
+        # The first few rounds only warm up caches
+        if number >= 10:
+            handler_ms.append(elapsed)
+            view_ms.append(direct)
+
+    return {'handler_ms': handler_ms, 'view_ms': view_ms}
+
+
+def measure_worker(application, warm):
+    """
+    Fork a child that serves two authenticated list requests from a
+    separate thread, the way a gthread worker of the preloading production
+    server starts, and return its timings and memory together with the
+    parent's
+    """
+    import threading
+
+    from django.db import connection, connections
+
+    from application_management.warmup import warm_application, warm_database
+    from candidates.benchmarks import bench_user, seed_candidates
+
+    # A file database survives the fork, unlike the in-memory test database
+    old_name = connection.settings_dict['NAME']
+    test_dir = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(test_dir, 'probe.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    seed_candidates(1000)
+    _, token = bench_user()
+
+    result = {}
+    if warm:
+        timings = {**warm_application(application), **warm_database()}
+        result['warm_ms'] = sum(timings.values())
+    connections.close_all()
+    result['master_rss_mb'] = rss_mb()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        worker = {}
+
+        def serve():
+            # Database connections are per thread, like in a gthread worker
+            path = '/api/candidates/'
+            _, worker['first_request_ms'] = call(application, make_environ(path, token))
+            _, worker['second_request_ms'] = call(application, make_environ(path, token))
+            connections.close_all()
+
+        try:
+            thread = threading.Thread(target=serve)
+            thread.start()
+            thread.join()
+            worker['worker_rss_mb'] = rss_mb()
+            worker['worker_private_mb'] = private_mb()
+        finally:
+            os.write(write_fd, json.dumps(worker).encode())
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        result.update(json.loads(pipe.read() or '{}'))
+    os.waitpid(pid, 0)
+
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    os.rmdir(test_dir)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--prepare', metavar='PATH',
+                        help='Create the database for --database and print its token')
+    parser.add_argument('--database', metavar='PATH',
+                        help='Database prepared with --prepare, for the first request')
+    parser.add_argument('--token', help='Token printed by --prepare')
+    parser.add_argument('--requests', type=int, default=0,
+                        help='Also time this many authenticated requests')
+    parser.add_argument('--warm', action='store_true',
+                        help='Warm the application up before the first request')
+    parser.add_argument('--fork', action='store_true',
+                        help='Serve the first requests from a forked worker process')
+    args = parser.parse_args(argv)
+
+    if args.prepare:
+        print(json.dumps({'token': prepare_database(args.prepare)}))
+        return
+
+    started = time.perf_counter()
+    if args.database:
+        use_database(args.database)
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    setup_ms = (time.perf_counter() - started) * 1000
+
+    result = {
+        'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+        'setup_ms': setup_ms,
+    }
+    if args.fork:
+        result.update(measure_worker(application, args.warm))
+        print(json.dumps(result))
+        return
+
+    if args.warm:
+        from application_management.warmup import warm_application
+        result['warm_ms'] = sum(warm_application(application).values())
+
+    status, first_request_ms = call(application, make_environ('/api/candidates/', args.token))
+
+    result.update({
+        'first_request_ms': first_request_ms,
+        'first_request_status': status,
+        'modules': len(sys.modules),
+        'rss_mb': rss_mb(),
+    })
+    if args.requests:
+        result.update(measure_requests(application, args.requests))
+
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+URL configuration for the API-only settings profile (no admin).
+"""
+
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('candidates.urls')),
+]
@@ -0,0 +1,148 @@
+"""
+Warms a freshly loaded application before it serves traffic.
+
+``warm_application`` does the work every worker would otherwise repeat on
+its first requests: importing the lazily loaded DRF classes and optional
+features, populating the URL resolver, building serializer fields (which fills the model metadata
+caches), loading translations and sending one unauthenticated request
+through the middleware. It never touches the database, so it can run in a
+preforking server's master before the workers are forked and the warmed
+memory is shared copy-on-write.
+
+``warm_database`` loads the position cache. It queries the database, so
+run it in the master as well and close the connections before forking;
+the loaded cache is then shared the same way. Database connections are not
+opened ahead of time: the threaded workers serve requests from pool
+threads and Django connections are per thread, so a connection opened in
+a worker's main thread would never be used. Persistent connections
+(``CONN_MAX_AGE``) keep the per-request connect cost down instead.
+"""
+
+import inspect
+import io
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def timed(timings, name, func):
+    started = time.perf_counter()
+    try:
+        func()
+    except Exception:
+        # A failed warm up step only costs the speed up it would have given
+        logger.warning("Warm up step %s failed", name, exc_info=True)
+    timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def warm_rest_framework():
+    """
+    Import the classes named in REST_FRAMEWORK, DRF loads them on first use
+    """
+    from rest_framework.settings import api_settings
+
+    for name in api_settings.user_settings:
+        getattr(api_settings, name)
+
+
+def warm_features():
+    """
+    Import the optional features the views load on first use
+    """
+    from candidates import analytics, batch, duplicates, facets  # noqa: F401
+
+    analytics.get_numpy()
+
+
+def warm_urls():
+    """
+    Populate the URL resolver and its reverse lookup tables
+    """
+    from django.urls import reverse
+
+    # The first reverse() populates the resolver
+    for name in ('candidate-list', 'job-list', 'login', 'batch'):
+        reverse(name)
+
+
+def warm_serializers():
+    """
+    Build the fields of every serializer and filter set of the API
+    """
+    from rest_framework import serializers as drf_serializers
+
+    from candidates import serializers
+    from candidates.filters import CandidateFilter
+
+    for _, serializer_class in inspect.getmembers(serializers, inspect.isclass):
+        if issubclass(serializer_class, drf_serializers.BaseSerializer) and serializer_class.__module__ == serializers.__name__:
+            serializer_class().fields
+
+    CandidateFilter().form
+
+
+def warm_translations():
+    from django.utils import translation
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Not found.')
+
+
+def warm_request(application):
+    """
+    Send an unauthenticated list request through the full WSGI handler.
+    It is rejected before any database access.
+    """
+    host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': '/api/candidates/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.url_scheme': 'http',
+    }
+    # Keep the expected 401 out of the logs
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        response = application(environ, lambda status, headers, exc_info=None: None)
+        b''.join(response)
+        response.close()
+    finally:
+        request_logger.setLevel(level)
+
+
+def warm_application(application=None):
+    """
+    Run the database free warm up steps, returns their timings in ms
+    """
+    timings = {}
+    timed(timings, 'rest_framework', warm_rest_framework)
+    timed(timings, 'features', warm_features)
+    timed(timings, 'urls', warm_urls)
+    timed(timings, 'serializers', warm_serializers)
+    timed(timings, 'translations', warm_translations)
+    if application is not None:
+        timed(timings, 'request', lambda: warm_request(application))
+    return timings
+
+
+def warm_database():
+    """
+    Load the position cache, returns the timings in ms. Close the database
+    connections afterwards when forking.
+    """
+    from candidates import positions
+
+    timings = {}
+    timed(timings, 'positions', positions.preload)
+    return timings
@@ -1,26 +1,171 @@
-from django.contrib import admin
-from .models import Candidate
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.db import transaction
+from django.urls import reverse
+from django.utils.html import format_html
+
+from . import counters
+from .jobs import enqueue
+from .large_tables import (
+    EstimatedCountPaginator, PeriodDatesQuerySet, get_setting, is_large_table, prefix_search
+)
+from .models import Candidate, Job, Position
+
+@admin.register(Position)
+class PositionAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the position catalogue
+    """
+    list_display = ['id', 'name', 'created_at']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+class LargeTableChangeList(ChangeList):
+    """
+    Changelist whose queryset builds the date hierarchy from MIN/MAX only
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return PeriodDatesQuerySet(model=queryset.model, query=queryset.query.chain(), using=queryset.db)
+
+
+def make_status_action(status):
+    """
+    Admin action setting the status of the selected candidates with one UPDATE
+    """
+    def set_status(modeladmin, request, queryset):
+        with transaction.atomic():
+            updated = counters.update_status(queryset, status)
+        modeladmin.message_user(request, f"{updated} candidate(s) marked as {status}.", messages.SUCCESS)
+
+    set_status.__name__ = f"mark_{status.lower()}"
+    return admin.action(description=f"Mark selected candidates as {status}")(set_status)
+
 
 @admin.register(Candidate)
 class CandidateAdmin(admin.ModelAdmin):
     """
-    Admin interface for Candidate model
+    Admin interface for Candidate model.
+
+    Switches to large table mode (see candidates/large_tables.py) once the
+    table grows past the ADMIN_LARGE_TABLES threshold.
     """
-    list_display = ['id', 'name', 'email', 'phone', 'position_applied', 'status', 'created_at']
-    list_filter = ['status', 'created_at']
-    search_fields = ['name', 'email', 'phone', 'position_applied']
+    list_display = ['id', 'name', 'email', 'phone', 'position', 'status', 'created_at']
+    list_filter = ['status', 'is_archived']
+    list_select_related = ['position']
+    autocomplete_fields = ['position']
+    search_fields = ['name', 'email', 'phone', 'position__name']
+    date_hierarchy = 'created_at'
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    actions = [make_status_action(status) for status, _ in Candidate.STATUS_CHOICES] + [
+        'export_selected', 'archive_selected', 'restore_selected', 'delete_archived'
+    ]
     
     fieldsets = (
         ('Personal Information', {
             'fields': ('name', 'email', 'phone')
         }),
         ('Job Details', {
-            'fields': ('position_applied', 'status')
+            'fields': ('position', 'status', 'is_archived')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+    
+    def large_table_mode(self, request):
+        """
+        Whether the candidate table is past the large table threshold,
+        checked once per request
+        """
+        if not hasattr(request, '_large_table_mode'):
+            request._large_table_mode = is_large_table(Candidate)
+        return request._large_table_mode
+    
+    def get_actions(self, request):
+        """
+        Drop the built-in "Delete selected", which loads and deletes every
+        selected row one by one; ``delete_archived`` replaces it
+        """
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+    
+    def get_changelist(self, request, **kwargs):
+        if self.large_table_mode(request):
+            return LargeTableChangeList
+        return super().get_changelist(request, **kwargs)
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Substring search on small tables, indexed prefix search on large ones
+        """
+        if not self.large_table_mode(request):
+            return super().get_search_results(request, queryset, search_term)
+
+        query = prefix_search(search_term)
+        if query is None:
+            return queryset, False
+        return queryset.filter(query), False
+    
+    @admin.action(description="Export selected candidates to CSV")
+    def export_selected(self, request, queryset):
+        """
+        Queue an export job for the selected candidates
+        """
+        limit = get_setting('MAX_EXPORT_ROWS')
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:limit + 1])
+        if len(ids) > limit:
+            self.message_user(request, f"Select at most {limit} candidates to export.", messages.ERROR)
+            return
+
+        job = enqueue('export_candidates', {'ids': ids, 'include_archived': True}, request.user)
+        link = reverse('admin:candidates_job_change', args=[job.pk])
+        self.message_user(
+            request,
+            format_html('Export of {} candidate(s) queued as <a href="{}">job {}</a>.', len(ids), link, job.pk),
+            messages.SUCCESS
+        )
+    
+    @admin.action(description="Archive selected candidates")
+    def archive_selected(self, request, queryset):
+        with transaction.atomic():
+            updated = counters.set_archived(queryset, True)
+        self.message_user(request, f"{updated} candidate(s) archived.", messages.SUCCESS)
+    
+    @admin.action(description="Restore selected candidates from the archive")
+    def restore_selected(self, request, queryset):
+        with transaction.atomic():
+            updated = counters.set_archived(queryset, False)
+        self.message_user(request, f"{updated} candidate(s) restored.", messages.SUCCESS)
+    
+    @admin.action(description="Delete selected archived candidates", permissions=['delete'])
+    def delete_archived(self, request, queryset):
+        """
+        Delete the archived candidates of the selection with one DELETE.
+        Candidates have to be archived first, which can be undone.
+        """
+        with transaction.atomic():
+            deleted = counters.delete_candidates(queryset.filter(is_archived=True))
+        self.message_user(request, f"{deleted} archived candidate(s) deleted.", messages.SUCCESS)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for background jobs
+    """
+    list_display = ['id', 'kind', 'status', 'progress', 'total', 'attempts', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'kind', 'payload', 'result', 'error', 'progress', 'total', 'attempts',
+        'locked_by', 'locked_at', 'created_by', 'created_at', 'started_at', 'finished_at'
+    ]
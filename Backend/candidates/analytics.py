@@ -0,0 +1,636 @@
+"""
+Columnar in-memory snapshot of the candidates for reporting queries.
+
+Reports like "applicants per position per week by status" are answered
+from compact per-column arrays instead of GROUP BY scans of the live
+table:
+
+- ``ids``: candidate ids, ascending
+- ``status``: index into ``Snapshot.statuses``
+- ``position``: index into ``Snapshot.position_ids``
+- ``created``: ``created_at`` in epoch seconds
+- ``live``: 0 for archived candidates
+- ``updated``: ``updated_at`` in epoch microseconds
+
+The snapshot is refreshed incrementally from ``updated_at`` at most every
+``REFRESH_INTERVAL`` seconds. Deleted rows do not show up there, and
+neither do changes committed by transactions that ran longer than the
+``OVERLAP`` the refresh re-reads. So every ``RECONCILE_INTERVAL`` seconds
+the id and ``updated_at`` of every row are compared with the snapshot,
+deleted rows are dropped and rows that differ are read again. It is
+rebuilt from scratch every ``REBUILD_INTERVAL`` seconds. Refreshes work on
+a copy that then replaces the current snapshot, so requests still reading
+the old one are not affected. With ``PATH`` set, snapshots are written to
+memory mapped files there, refreshed by one worker at a time and shared by
+all workers on the machine.
+
+Queries use NumPy when it is installed and plain iterator pipelines
+otherwise. NumPy is imported by the first query, so processes that never
+run a report do not load it. Time buckets use the current timezone's UTC offset at refresh
+time, so around DST changes rows close to midnight can land in the
+neighbouring day.
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import operator
+import os
+import shutil
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import compress, repeat
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Candidate
+from .positions import get_position_name
+
+logger = logging.getLogger(__name__)
+
+# Defaults, can be overridden with the ANALYTICS setting
+DEFAULTS = {
+    'REFRESH_INTERVAL': 5,
+    'RECONCILE_INTERVAL': 60,
+    'REBUILD_INTERVAL': 3600,
+    'PATH': None,
+}
+
+# Column name -> array typecode
+COLUMNS = {
+    'ids': 'q',
+    'status': 'B',
+    'position': 'I',
+    'created': 'q',
+    'live': 'B',
+    'updated': 'q',
+}
+
+# Groupable fields and the columns holding them
+COLUMN_NAMES = {'status': 'status', 'position_applied': 'position'}
+GROUP_BY = list(COLUMN_NAMES)
+BUCKETS = ['day', 'week', 'month']
+
+# NumPy module once imported, None when it is not installed
+_numpy = False
+
+# Rows changed this long before the last refresh are read again, in case
+# their transaction committed after that refresh. Later commits are found
+# by the reconciliation.
+OVERLAP = timedelta(seconds=5)
+
+BATCH_SIZE = 5000
+DAY = 86400
+
+# Candidate fields read into a snapshot row
+FIELDS = ['id', 'status', 'position_id', 'created_at', 'is_archived', 'updated_at']
+
+
+def get_setting(name):
+    return getattr(settings, 'ANALYTICS', {}).get(name, DEFAULTS[name])
+
+
+def get_numpy():
+    """
+    Return the numpy module, or None when it is not installed
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+class RebuildNeeded(Exception):
+    """
+    Raised when changes cannot be applied incrementally
+    """
+
+
+class Snapshot:
+    """
+    One version of the columnar candidate data
+    """
+
+    def __init__(self, columns=None, statuses=None, position_ids=None, meta=None):
+        meta = meta or {}
+        self.columns = columns or {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.statuses = statuses or [value for value, _ in Candidate.STATUS_CHOICES]
+        self.position_ids = position_ids or []
+        self.high_water = datetime.fromisoformat(meta['high_water']) if meta.get('high_water') else None
+        self.built_at = meta.get('built_at', time.time())
+        self.refreshed_at = meta.get('refreshed_at', time.time())
+        self.reconciled_at = meta.get('reconciled_at', time.time())
+        self.offset = meta.get('offset', 0)
+        self.generation = meta.get('generation')
+        self.checked_at = time.monotonic()
+        self._position_codes = {pk: code for code, pk in enumerate(self.position_ids)}
+
+    def __len__(self):
+        return len(self.columns['ids'])
+
+    @property
+    def nbytes(self):
+        return sum(len(column) * array(COLUMNS[name]).itemsize for name, column in self.columns.items())
+
+    def meta(self):
+        return {
+            'high_water': self.high_water.isoformat() if self.high_water else None,
+            'built_at': self.built_at,
+            'refreshed_at': self.refreshed_at,
+            'reconciled_at': self.reconciled_at,
+            'offset': self.offset,
+            'generation': self.generation,
+            'statuses': self.statuses,
+            'position_ids': self.position_ids,
+        }
+
+    # Building and refreshing
+
+    @classmethod
+    def build(cls):
+        """
+        Load all candidates
+        """
+        snapshot = cls()
+        snapshot.offset = current_offset()
+        snapshot.append_rows(
+            Candidate.objects.order_by('id').values_list(*FIELDS).iterator(chunk_size=BATCH_SIZE)
+        )
+        return snapshot
+
+    def copy(self):
+        """
+        Writable copy, e.g. of a snapshot mapped from files
+        """
+        columns = {}
+        for name, column in self.columns.items():
+            columns[name] = array(COLUMNS[name])
+            columns[name].frombytes(memoryview(column).cast('B'))
+        return Snapshot(columns, list(self.statuses), list(self.position_ids), self.meta())
+
+    def encode(self, status, position_id):
+        if status not in self.statuses:
+            self.statuses.append(status)
+        code = self._position_codes.get(position_id)
+        if code is None:
+            code = self._position_codes[position_id] = len(self.position_ids)
+            self.position_ids.append(position_id)
+        return self.statuses.index(status), code
+
+    def append_rows(self, rows):
+        columns = self.columns
+        high_water = self.high_water
+        for pk, status, position_id, created_at, is_archived, updated_at in rows:
+            status_code, position_code = self.encode(status, position_id)
+            columns['ids'].append(pk)
+            columns['status'].append(status_code)
+            columns['position'].append(position_code)
+            columns['created'].append(int(created_at.timestamp()))
+            columns['live'].append(0 if is_archived else 1)
+            columns['updated'].append(epoch_micros(updated_at))
+            if high_water is None or updated_at > high_water:
+                high_water = updated_at
+        self.high_water = high_water
+        self.refreshed_at = time.time()
+
+    def set_row(self, index, row):
+        """
+        Overwrite the row at ``index``, returns its ``updated_at``
+        """
+        _, status, position_id, created_at, is_archived, updated_at = row
+        columns = self.columns
+        status_code, position_code = self.encode(status, position_id)
+        columns['status'][index] = status_code
+        columns['position'][index] = position_code
+        # Ids of deleted rows can be reused
+        columns['created'][index] = int(created_at.timestamp())
+        columns['live'][index] = 0 if is_archived else 1
+        columns['updated'][index] = epoch_micros(updated_at)
+        return updated_at
+
+    def update(self):
+        """
+        Apply rows changed since the last refresh in place, reconciling
+        every RECONCILE_INTERVAL. Raises RebuildNeeded when that is not
+        possible.
+        """
+        if time.time() - self.built_at > get_setting('REBUILD_INTERVAL'):
+            raise RebuildNeeded("rebuild interval passed")
+        if self.offset != current_offset():
+            raise RebuildNeeded("UTC offset changed")
+
+        changed = Candidate.objects.order_by('id').values_list(*FIELDS)
+        if self.high_water:
+            changed = changed.filter(updated_at__gte=self.high_water - OVERLAP)
+
+        ids = self.columns['ids']
+        new_rows = []
+        high_water = self.high_water
+        for row in changed.iterator(chunk_size=BATCH_SIZE):
+            pk = row[0]
+            index = bisect.bisect_left(ids, pk)
+            if index < len(ids) and ids[index] == pk:
+                updated_at = self.set_row(index, row)
+                if high_water is None or updated_at > high_water:
+                    high_water = updated_at
+            elif index == len(ids) and (not new_rows or pk > new_rows[-1][0]):
+                new_rows.append(row)
+            else:
+                raise RebuildNeeded(f"candidate {pk} committed out of id order")
+
+        self.high_water = high_water
+        self.append_rows(new_rows)
+
+        if time.time() - self.reconciled_at >= get_setting('RECONCILE_INTERVAL'):
+            self.reconcile()
+
+    def reconcile(self):
+        """
+        Compare the id and ``updated_at`` of every candidate with the
+        snapshot: drop deleted rows and read rows whose change the
+        incremental refreshes missed again. Raises RebuildNeeded for missed
+        rows below the newest id, which cannot be appended.
+        """
+        ids = self.columns['ids']
+        updated = self.columns['updated']
+        keep = bytearray(b'\x01') * len(ids)
+        stale = []
+        missing = []
+        index = 0
+        rows = Candidate.objects.order_by('id').values_list('id', 'updated_at')
+        for pk, updated_at in rows.iterator(chunk_size=BATCH_SIZE):
+            # Both sides are ordered by id, snapshot ids skipped here are gone
+            while index < len(ids) and ids[index] < pk:
+                keep[index] = 0
+                index += 1
+            if index < len(ids) and ids[index] == pk:
+                if updated[index] != epoch_micros(updated_at):
+                    stale.append(pk)
+                index += 1
+            else:
+                missing.append(pk)
+        keep[index:] = bytes(len(ids) - index)
+
+        removed = len(keep) - sum(keep)
+        if removed:
+            for name, column in self.columns.items():
+                self.columns[name] = array(COLUMNS[name], compress(column, keep))
+            ids = self.columns['ids']
+        if missing and ids and missing[0] < ids[-1]:
+            raise RebuildNeeded(f"candidate {missing[0]} committed below the newest id")
+
+        high_water = self.high_water
+        for start in range(0, len(stale), BATCH_SIZE):
+            chunk = Candidate.objects.filter(id__in=stale[start:start + BATCH_SIZE]).values_list(*FIELDS)
+            for row in chunk:
+                updated_at = self.set_row(bisect.bisect_left(ids, row[0]), row)
+                if high_water is None or updated_at > high_water:
+                    high_water = updated_at
+        self.high_water = high_water
+        for start in range(0, len(missing), BATCH_SIZE):
+            self.append_rows(
+                Candidate.objects.filter(id__in=missing[start:start + BATCH_SIZE])
+                .order_by('id').values_list(*FIELDS)
+            )
+
+        if removed or stale or missing:
+            logger.info(
+                "Analytics reconciliation: %s deleted, %s changed and %s added candidates",
+                removed, len(stale), len(missing)
+            )
+        self.reconciled_at = self.refreshed_at = time.time()
+
+    # Persistence
+
+    def save(self, path):
+        """
+        Write the snapshot as a new generation under ``path`` and make it
+        the current one
+        """
+        self.generation = f"snapshot-{time.time_ns()}"
+        directory = os.path.join(path, self.generation)
+        os.makedirs(directory)
+        for name, column in self.columns.items():
+            with open(os.path.join(directory, f"{name}.bin"), 'wb') as column_file:
+                column_file.write(column.tobytes() if isinstance(column, array) else bytes(column))
+        with open(os.path.join(directory, 'meta.json'), 'w') as meta_file:
+            json.dump(self.meta(), meta_file)
+
+        pointer = os.path.join(path, 'current')
+        with open(pointer + '.tmp', 'w') as pointer_file:
+            pointer_file.write(self.generation)
+        os.replace(pointer + '.tmp', pointer)
+
+        # Workers still mapping an old generation keep their mapping
+        for entry in os.listdir(path):
+            if entry.startswith('snapshot-') and entry != self.generation:
+                shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, generation):
+        """
+        Map a saved generation read-only, shared with every other process
+        mapping it
+        """
+        directory = os.path.join(path, generation)
+        with open(os.path.join(directory, 'meta.json')) as meta_file:
+            meta = json.load(meta_file)
+
+        columns = {}
+        for name, typecode in COLUMNS.items():
+            with open(os.path.join(directory, f"{name}.bin"), 'rb') as column_file:
+                if os.fstat(column_file.fileno()).st_size == 0:
+                    columns[name] = array(typecode)
+                else:
+                    mapped = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    columns[name] = memoryview(mapped).cast(typecode)
+        return cls(columns, meta['statuses'], meta['position_ids'], meta)
+
+    # Queries
+
+    def query(self, group_by=(), bucket=None, status=None, position_id=None, since=None, until=None):
+        """
+        Count live candidates grouped by any of ``GROUP_BY`` and optionally
+        a ``bucket`` of their creation date, filtered by status, position id
+        and a [since, until) range of aware datetimes.
+
+        Returns ``[{'status': ..., 'position_applied': ..., 'bucket': ..., 'count': n}]``
+        with only the requested keys.
+        """
+        filters = {}
+        if status is not None:
+            if status not in self.statuses:
+                return []
+            filters['status'] = self.statuses.index(status)
+        if position_id is not None:
+            if position_id not in self._position_codes:
+                return []
+            filters['position'] = self._position_codes[position_id]
+        since = int(since.timestamp()) if since else None
+        until = int(until.timestamp()) if until else None
+
+        keys = [COLUMN_NAMES[name] for name in GROUP_BY if name in group_by]
+        run = query_numpy if get_numpy() is not None else query_python
+        counts = run(self, keys, bucket is not None, filters, since, until)
+        return self.decode(counts, keys, bucket)
+
+    def decode(self, counts, keys, bucket):
+        """
+        Turn ``{(day, *codes): count}`` into result rows, rolling days up
+        into the requested bucket
+        """
+        buckets = {}
+        rolled = Counter()
+        for key, total in counts.items():
+            day = key[0]
+            if bucket and day not in buckets:
+                buckets[day] = bucket_start(day, bucket).isoformat()
+            rolled[(buckets.get(day), *key[1:])] += total
+
+        labels = {
+            'status': ('status', self.statuses),
+            'position': ('position_applied', [get_position_name(pk) for pk in self.position_ids]),
+        }
+        columns = [labels[name] for name in keys]
+
+        # Order by bucket, then status (workflow order) and position name,
+        # whatever order the codes were assigned in
+        names = labels['position'][1]
+        by_name = sorted(range(len(names)), key=lambda code: names[code] or '')
+        ranks = {
+            'status': range(len(self.statuses)),
+            'position': {code: rank for rank, code in enumerate(by_name)},
+        }
+        key_ranks = [ranks[name] for name in keys]
+
+        def order(item):
+            key = item[0]
+            return (key[0] or '', *(rank[code] for rank, code in zip(key_ranks, key[1:])))
+
+        results = []
+        for key, total in sorted(rolled.items(), key=order):
+            row = {field: values[code] for (field, values), code in zip(columns, key[1:])}
+            if bucket:
+                row['bucket'] = key[0]
+            row['count'] = total
+            results.append(row)
+        return results
+
+
+def query_python(snapshot, keys, by_day, filters, since, until):
+    """
+    Grouped counts using iterator pipelines that run in C
+    """
+    columns = snapshot.columns
+    selectors = [columns['live']]
+    for name, code in filters.items():
+        selectors.append(map(operator.eq, columns[name], repeat(code)))
+    if since is not None:
+        selectors.append(map(operator.ge, columns['created'], repeat(since)))
+    if until is not None:
+        selectors.append(map(operator.lt, columns['created'], repeat(until)))
+    mask = selectors[0] if len(selectors) == 1 else map(all, zip(*selectors))
+
+    if by_day:
+        days = map(operator.floordiv, map(operator.add, columns['created'], repeat(snapshot.offset)), repeat(DAY))
+    else:
+        days = repeat(None)
+    parts = [days] + [columns[name] for name in keys]
+    return Counter(compress(zip(*parts), mask))
+
+
+def query_numpy(snapshot, keys, by_day, filters, since, until):
+    """
+    Grouped counts with NumPy: one combined integer key per row, counted
+    with ``numpy.unique``
+    """
+    numpy = get_numpy()
+    columns = {
+        name: numpy.frombuffer(column, dtype=numpy.dtype(COLUMNS[name]))
+        for name, column in snapshot.columns.items()
+    }
+    mask = columns['live'] == 1
+    for name, code in filters.items():
+        mask &= columns[name] == code
+    if since is not None:
+        mask &= columns['created'] >= since
+    if until is not None:
+        mask &= columns['created'] < until
+
+    parts = []
+    if by_day:
+        days = (columns['created'][mask] + snapshot.offset) // DAY
+        first_day = int(days.min()) if len(days) else 0
+        parts.append((days - first_day, int(days.max()) - first_day + 1 if len(days) else 1))
+    for name in keys:
+        sizes = {'status': len(snapshot.statuses), 'position': len(snapshot.position_ids)}
+        parts.append((columns[name][mask].astype(numpy.int64), max(1, sizes[name])))
+
+    if not parts:
+        return Counter({(None,): int(mask.sum())}) if mask.any() else Counter()
+
+    combined = numpy.zeros(int(mask.sum()), dtype=numpy.int64)
+    for values, size in parts:
+        combined = combined * size + values
+    uniques, totals = numpy.unique(combined, return_counts=True)
+
+    counts = Counter()
+    for value, total in zip(uniques.tolist(), totals.tolist()):
+        key = []
+        for _, size in reversed(parts):
+            value, code = divmod(value, size)
+            key.append(code)
+        key.reverse()
+        if by_day:
+            key[0] += first_day
+        else:
+            key.insert(0, None)
+        counts[tuple(key)] = total
+    return counts
+
+
+def bucket_start(day, bucket):
+    """
+    First date of the day, week (Monday) or month containing epoch ``day``
+    """
+    value = date(1970, 1, 1) + timedelta(days=day)
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def day_start(value):
+    """
+    Aware datetime of the start of date ``value`` in the current timezone
+    """
+    start = datetime.combine(value, datetime.min.time())
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def epoch_micros(value):
+    return round(value.timestamp() * 1_000_000)
+
+
+def current_offset():
+    return int(timezone.localtime().utcoffset().total_seconds()) if settings.USE_TZ else 0
+
+
+@contextmanager
+def refresh_lock(path, blocking):
+    """
+    Inter-process lock so only one worker refreshes the shared snapshot.
+    Yields False when ``blocking`` is off and another worker holds it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): every process refreshes on its own
+        yield True
+        return
+
+    with open(os.path.join(path, 'refresh.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def refreshed(snapshot):
+    """
+    Bring a writable snapshot up to date in place, or rebuild it. Pass a
+    copy of a snapshot other threads may be reading.
+    """
+    if snapshot is None:
+        return Snapshot.build()
+    try:
+        snapshot.update()
+    except RebuildNeeded as e:
+        logger.info("Rebuilding the analytics snapshot: %s", e)
+        return Snapshot.build()
+    return snapshot
+
+
+def refreshed_shared(path, snapshot):
+    """
+    Map the newest saved snapshot, refreshing and saving it first when it is
+    older than the refresh interval and no other worker is already on it
+    """
+    os.makedirs(path, exist_ok=True)
+
+    def newest():
+        try:
+            with open(os.path.join(path, 'current')) as pointer_file:
+                generation = pointer_file.read().strip()
+        except FileNotFoundError:
+            return None
+        if snapshot is not None and snapshot.generation == generation:
+            return snapshot
+        try:
+            return Snapshot.load(path, generation)
+        except FileNotFoundError:
+            # Replaced and removed by another worker in the meantime
+            return None
+
+    mapped = newest()
+    if mapped is not None and time.time() - mapped.refreshed_at < get_setting('REFRESH_INTERVAL'):
+        return mapped
+
+    with refresh_lock(path, blocking=mapped is None) as locked:
+        if not locked:
+            return mapped
+        # Another worker may have refreshed while we waited for the lock
+        mapped = newest()
+        if mapped is not None and time.time() - mapped.refreshed_at < get_setting('REFRESH_INTERVAL'):
+            return mapped
+        updated = refreshed(mapped.copy() if mapped is not None else None)
+        updated.save(path)
+        return Snapshot.load(path, updated.generation)
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_snapshot():
+    """
+    Current snapshot of this process, refreshed when it is older than
+    REFRESH_INTERVAL
+    """
+    global _snapshot
+    with _lock:
+        if _snapshot is not None and time.monotonic() - _snapshot.checked_at < get_setting('REFRESH_INTERVAL'):
+            return _snapshot
+
+        path = get_setting('PATH')
+        if path:
+            snapshot = refreshed_shared(str(path), _snapshot)
+        else:
+            # Views query the current snapshot without the lock, so it is
+            # never changed in place; the refreshed copy replaces it
+            snapshot = refreshed(_snapshot.copy() if _snapshot is not None else None)
+        snapshot.checked_at = time.monotonic()
+        _snapshot = snapshot
+        return snapshot
+
+
+def clear():
+    global _snapshot
+    with _lock:
+        _snapshot = None
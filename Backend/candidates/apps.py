@@ -5,3 +5,7 @@ class CandidatesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'candidates'
     verbose_name = 'Candidate Management'
+
+    def ready(self):
+        # Register background job handlers and signal handlers
+        from . import signals, tasks  # noqa: F401
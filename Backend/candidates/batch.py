@@ -0,0 +1,116 @@
+"""
+Multiplexed sub-requests for the ``/api/batch/`` endpoint.
+
+Each sub-request is dispatched straight to the DRF view that owns its route,
+reusing the user already authenticated on the outer request. That skips the
+per-call HTTP round trip, middleware stack and token lookup.
+"""
+
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+# Only the candidate routes may be called through a batch
+ALLOWED_ROUTES = {'candidate-list', 'candidate-detail', 'candidate-update-status'}
+
+# Request metadata copied from the outer request onto every sub-request
+FORWARDED_META = ('SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL', 'REMOTE_ADDR', 'SCRIPT_NAME')
+
+# Defaults, can be overridden with the BATCH_REQUESTS setting
+DEFAULTS = {
+    'MAX_IDS': 100,
+    'MAX_REQUESTS': 20,
+    'MAX_THREADS': 4,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'BATCH_REQUESTS', {}).get(name, DEFAULTS[name])
+
+
+def build_subrequest(request, method, path, body=None):
+    """
+    Build a plain Django request for one batch item, authenticated as the
+    user of the outer request
+    """
+    path, _, query_string = path.partition('?')
+    data = json.dumps(body).encode() if body is not None else b''
+
+    environ = {key: value for key, value in request.META.items()
+               if key.startswith('HTTP_') or key in FORWARDED_META}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.url_scheme': request.scheme,
+    })
+
+    subrequest = WSGIRequest(environ)
+    # Picked up by DRF's Request, so the token is not looked up again
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    # Reads were paid for by the batch (see BatchRateThrottle)
+    subrequest.charged_to_batch = method == 'GET'
+    return subrequest
+
+
+def run_subrequest(request, item):
+    """
+    Run one batch item and return its status code and response body
+    """
+    path = item['path'].split('?')[0]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'status': 404, 'body': {'error': f'No route for {path}'}}
+
+    if match.url_name not in ALLOWED_ROUTES:
+        return {'status': 400, 'body': {'error': f'{path} cannot be used in a batch'}}
+
+    subrequest = build_subrequest(request, item['method'], item['path'], item.get('body'))
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", item['method'], item['path'])
+        return {'status': 500, 'body': {'error': 'Internal server error'}}
+
+    return {'status': response.status_code, 'body': getattr(response, 'data', None)}
+
+
+def run_batch(request, items, parallel=False):
+    """
+    Run all batch items and return their results in the same order.
+
+    Items run one after another by default. With ``parallel`` and only GET
+    items, they are spread over a small thread pool; each thread handles a
+    fixed share of the items so it opens a single database connection.
+    """
+    threads = min(get_setting('MAX_THREADS'), len(items))
+    if not parallel or threads < 2 or any(item['method'] != 'GET' for item in items):
+        return [run_subrequest(request, item) for item in items]
+
+    results = [None] * len(items)
+
+    def run_share(offset):
+        try:
+            for index in range(offset, len(items), threads):
+                results[index] = run_subrequest(request, items[index])
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(run_share, offset) for offset in range(threads)]:
+            future.result()
+
+    return results
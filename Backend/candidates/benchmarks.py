@@ -0,0 +1,593 @@
+"""
+Benchmark suites for the ``benchmark`` management command.
+
+Suites run against a throwaway test database (the same one ``manage.py test``
+uses), so they never touch real data. Register a suite with the ``suite``
+decorator; it is called as ``func(options, out)`` where ``out`` is the
+command's stdout.
+"""
+
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+from . import positions
+from .models import Candidate, Position
+
+SUITES = {}
+
+POSITION_NAMES = [
+    'Frontend Developer', 'Backend Developer', 'Full Stack Developer', 'UI/UX Designer',
+    'DevOps Engineer', 'QA Engineer', 'Data Analyst', 'Product Manager',
+    'Business Analyst', 'Cloud Engineer', 'HR Executive', 'Mobile App Developer',
+]
+
+STATUSES = [value for value, _ in Candidate.STATUS_CHOICES]
+
+SETTINGS_PROFILES = [
+    ('full', 'application_management.settings'),
+    ('api-only', 'application_management.settings_api'),
+]
+
+
+def suite(name, description):
+    """
+    Register a benchmark suite
+    """
+    def decorator(func):
+        SUITES[name] = (func, description)
+        return func
+    return decorator
+
+
+@contextmanager
+def bench_database():
+    """
+    Run the enclosed code against a fresh, migrated and empty test database,
+    with request throttling disabled
+    """
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+
+    from . import analytics, singleflight, throttling
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    # Connections of request threads keep SQLite's shared in-memory test
+    # database alive after destroy_test_db (closing them is a no-op), so
+    # the previous suite's rows may still be there
+    call_command('flush', verbosity=0, interactive=False)
+    positions.clear_cache()
+    analytics.clear()
+    singleflight.groups.clear()
+    throttling.local_store.clear()
+    cache.clear()
+    # Suites fire far more requests than the throttle budgets allow
+    throttling = {**getattr(settings, 'THROTTLING', {}), 'ENABLED': False}
+    try:
+        with override_settings(THROTTLING=throttling):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        positions.clear_cache()
+
+
+def seed_candidates(count, batch_size=5000, seed=42):
+    """
+    Insert ``count`` generated candidates spread over the sample positions
+    """
+    rng = random.Random(seed)
+    catalogue = [
+        Position.objects.get_or_create(key=Position.make_key(name), defaults={'name': name})[0]
+        for name in POSITION_NAMES
+    ]
+    start_id = Candidate.objects.count()
+
+    for offset in range(0, count, batch_size):
+        batch = []
+        for number in range(start_id + offset, start_id + min(offset + batch_size, count)):
+            candidate = Candidate(
+                name=f"Candidate {number}",
+                email=f"candidate{number}@example.com",
+                phone=f"9{number:09d}"[-10:],
+                position=rng.choice(catalogue),
+                status=rng.choice(STATUSES),
+            )
+            candidate.update_blocking_keys()
+            batch.append(candidate)
+        Candidate.objects.bulk_create(batch)
+
+
+def spread_created_at(days=730):
+    """
+    Spread the creation dates of all candidates evenly over the last
+    ``days`` days; bulk inserted rows otherwise share one timestamp
+    """
+    from datetime import timedelta
+
+    from django.db.models import DurationField, ExpressionWrapper, F
+    from django.utils import timezone
+
+    last_id = Candidate.objects.order_by('-id').values_list('id', flat=True).first()
+    if not last_id:
+        return
+    # Durations are stored as microseconds, so an integer product is a duration
+    step = timedelta(days=days) // last_id // timedelta(microseconds=1)
+    offset = ExpressionWrapper(F('id') * step, output_field=DurationField())
+    Candidate.objects.update(created_at=timezone.now() - offset)
+
+
+def bench_user(username='bench', staff=False):
+    """
+    Create a user and return it with its API token key
+    """
+    user = User.objects.create_user(username=username, password='bench-password', is_staff=staff, is_superuser=staff)
+    token = Token.objects.create(user=user)
+    return user, token.key
+
+
+def measure(func, repeat, warmup=3):
+    """
+    Call ``func`` repeatedly and return the timings in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_probe(settings_module, *args):
+    """
+    Run application_management.startup_probe in a fresh interpreter
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-m', 'application_management.startup_probe', *args],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(timings):
+    """
+    Mean and percentiles of a list of timings
+    """
+    return {
+        'mean': statistics.fmean(timings),
+        'p50': percentile(timings, 0.50),
+        'p95': percentile(timings, 0.95),
+        'max': max(timings),
+    }
+
+
+def write_table(out, title, rows, unit='ms'):
+    """
+    Print ``(label, timings)`` rows as a table of summary statistics
+    """
+    out.write(f"\n{title}")
+    out.write(f"{'':<44}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}  ({unit})")
+    for label, timings in rows:
+        stats = summarize(timings)
+        out.write(
+            f"{label:<44}{stats['mean']:>10.3f}{stats['p50']:>10.3f}"
+            f"{stats['p95']:>10.3f}{stats['max']:>10.3f}"
+        )
+
+
+@suite('batch', "N detail GETs vs ?ids= vs /api/batch/ (sequential and parallel)")
+def bench_batch(options, out):
+    from rest_framework.test import APIClient
+
+    seed_candidates(options['rows'])
+    _, token = bench_user()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+
+    size = options['size']
+    ids = list(Candidate.objects.order_by('?').values_list('id', flat=True)[:size])
+    items = [{'method': 'GET', 'path': f'/api/candidates/{pk}/'} for pk in ids]
+
+    def separate_calls():
+        for pk in ids:
+            client.get(f'/api/candidates/{pk}/')
+
+    def ids_query():
+        client.get('/api/candidates/', {'ids': ','.join(map(str, ids))})
+
+    def batch(parallel):
+        return lambda: client.post('/api/batch/', {'requests': items, 'parallel': parallel}, format='json')
+
+    repeat = options['repeat']
+    write_table(out, f"Fetching {size} candidates out of {options['rows']}", [
+        (f"{size} separate GET /candidates/{{id}}/", measure(separate_calls, repeat)),
+        ("GET /candidates/?ids=...", measure(ids_query, repeat)),
+        ("POST /batch/ sequential", measure(batch(False), repeat)),
+        ("POST /batch/ parallel", measure(batch(True), repeat)),
+    ])
+    out.write(
+        "\nIn-process timings: separate calls additionally pay one network "
+        "round trip each in production."
+    )
+
+
+@suite('facets', "Plain list vs list with ?facets= (counters, grouped query, cached)")
+def bench_facets(options, out):
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+
+    from . import counters
+
+    seed_candidates(options['rows'])
+    counters.rebuild()
+    _, token = bench_user()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+
+    def get(params, clear_cache=True):
+        def call():
+            if clear_cache:
+                cache.clear()
+            client.get('/api/candidates/', params)
+        return call
+
+    facets = 'status,position_applied'
+    repeat = options['repeat']
+    write_table(out, f"List page over {options['rows']} candidates", [
+        ("plain list", measure(get({}), repeat)),
+        ("facets, no search (counters)", measure(get({'facets': facets}), repeat)),
+        ("facets, no search, cached", measure(get({'facets': facets}, False), repeat)),
+        ("plain list, search", measure(get({'search': 'candidate 1'}), repeat)),
+        ("facets, search (grouped query)", measure(get({'search': 'candidate 1', 'facets': facets}), repeat)),
+        ("facets, search, cached", measure(get({'search': 'candidate 1', 'facets': facets}, False), repeat)),
+        ("plain list + one ?status= request per chip", measure(
+            lambda: [client.get('/api/candidates/', {'status': value}) for value in [''] + STATUSES],
+            repeat
+        )),
+    ])
+
+
+@suite('startup', "Cold start of the full vs the API-only settings profile")
+def bench_startup(options, out):
+    runs = max(3, min(options['repeat'], 10))
+
+    # The first request is an authenticated list against a seeded file
+    # database, created once with the full profile so it has every table
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'probe.sqlite3')
+        token = run_probe(SETTINGS_PROFILES[0][1], '--prepare', path)['token']
+        results = {
+            label: [run_probe(module, '--database', path, '--token', token) for _ in range(runs)]
+            for label, module in SETTINGS_PROFILES
+        }
+
+    for metric, title, unit in [
+        ('process_ms', "Interpreter start to first response", 'ms'),
+        ('setup_ms', "Django setup and application import", 'ms'),
+        ('first_request_ms', "First authenticated list request", 'ms'),
+        ('rss_mb', "RSS after the first request", 'MB'),
+        ('modules', "Imported modules", 'count'),
+    ]:
+        write_table(out, f"{title} ({runs} runs)", [
+            (label, [run[metric] for run in runs_for_profile])
+            for label, runs_for_profile in results.items()
+        ], unit)
+
+
+@suite('warmup', "First request and memory of a forked worker, without vs with warm up")
+def bench_warmup(options, out):
+    if not hasattr(os, 'fork'):
+        out.write("Needs os.fork(), skipping\n")
+        return
+
+    runs = max(3, min(options['repeat'], 10))
+    results = {
+        f"{label}, {'warmed' if warm else 'cold'}": [
+            run_probe(module, '--fork', *(['--warm'] if warm else [])) for _ in range(runs)
+        ]
+        for label, module in SETTINGS_PROFILES
+        for warm in (False, True)
+    }
+
+    for metric, title, unit in [
+        ('first_request_ms', "Worker's first authenticated list request", 'ms'),
+        ('second_request_ms', "Worker's second request", 'ms'),
+        ('worker_rss_mb', "Worker RSS after two requests", 'MB'),
+        ('worker_private_mb', "Worker memory not shared with the master", 'MB'),
+    ]:
+        rows = [
+            (label, [run[metric] for run in runs_for_variant])
+            for label, runs_for_variant in results.items()
+            if all(run.get(metric) is not None for run in runs_for_variant)
+        ]
+        if rows:
+            write_table(out, f"{title} ({runs} runs)", rows, unit)
+
+
+@suite('middleware', "Per-request middleware cost of the full vs the API-only profile")
+def bench_middleware(options, out):
+    rows = []
+    for label, module in SETTINGS_PROFILES:
+        result = run_probe(module, '--requests', str(options['repeat']))
+        rows += [
+            (f"{label}: through WSGI handler", result['handler_ms']),
+            (f"{label}: view only", result['view_ms']),
+            (f"{label}: middleware + handler overhead",
+             [handler - view for handler, view in zip(result['handler_ms'], result['view_ms'])]),
+        ]
+
+    write_table(out, "Authenticated GET /api/candidates/", rows)
+
+
+@suite('admin', "Candidate admin changelist in default vs large table mode")
+def bench_admin(options, out):
+    from django.apps import apps
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    if not apps.is_installed('django.contrib.admin'):
+        out.write("The admin is not installed in this settings profile, skipping\n")
+        return
+
+    seed_candidates(options['rows'])
+    spread_created_at()
+    user, _ = bench_user(staff=True)
+    client = Client()
+    client.force_login(user)
+
+    year = Candidate.objects.order_by('-created_at').values_list('created_at__year', flat=True).first()
+    pages = [
+        ("first page", {}),
+        ("search name", {'q': 'Candidate 12'}),
+        ("search email", {'q': 'candidate12@'}),
+        ("search phone", {'q': '900000012'}),
+        ("status filter", {'status__exact': 'Interview'}),
+        ("date hierarchy year", {'created_at__year': year}),
+        ("last page", {'p': options['rows'] // 100}),
+    ]
+
+    # Large mode needs the row estimate above the threshold
+    threshold = max(1, options['rows'] // 2)
+    for label, large_tables in [
+        ("default", {'THRESHOLD': 10 ** 12}),
+        (f"large table mode (threshold {threshold})", {'THRESHOLD': threshold}),
+    ]:
+        with override_settings(ADMIN_LARGE_TABLES=large_tables):
+            write_table(out, f"GET /admin/candidates/candidate/, {label}, {options['rows']} candidates", [
+                (name, measure(lambda params=params: client.get('/admin/candidates/candidate/', params), options['repeat']))
+                for name, params in pages
+            ])
+
+
+@suite('throttle', "Cost of one throttle check (local and cache backends) and per request")
+def bench_throttle(options, out):
+    from django.core.cache import caches
+    from django.test.utils import override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIClient, APIRequestFactory
+
+    from . import throttling
+    from .views import CandidateViewSet
+
+    seed_candidates(min(options['rows'], 1000))
+    user, token = bench_user()
+    loops = 1000
+    repeat = options['repeat']
+    keys = [f'throttle:read:{number}' for number in range(10000)]
+
+    def take(store, many_keys):
+        def call():
+            for number in range(loops):
+                key = keys[number % len(keys)] if many_keys else keys[0]
+                store.take(key, 10 ** 9, 60)
+        return call
+
+    django_request = APIRequestFactory().get('/api/candidates/')
+    request = Request(django_request)
+    request.user = user
+    view = CandidateViewSet(action='list')
+
+    def allow_request():
+        throttle = throttling.ActionRateThrottle()
+        for _ in range(loops):
+            throttle.allow_request(request, view)
+
+    rates = {'read': '1000000000/min', 'write': None, 'bulk': None, 'batch': None, 'export': None, 'login': None}
+    with override_settings(
+        THROTTLING={'ENABLED': True},
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+    ):
+        local = throttling.LocalBucketStore()
+        shared = throttling.CacheBucketStore('default')
+        caches['default'].clear()
+        # Timings are per 1000 checks, i.e. microseconds per check
+        write_table(out, f"One throttle check ({loops} per sample)", [
+            ("local store, one key", measure(take(local, False), repeat)),
+            ("local store, 10k keys", measure(take(local, True), repeat)),
+            ("cache store (CACHES['default']), one key", measure(take(shared, False), repeat)),
+            ("cache store (CACHES['default']), 10k keys", measure(take(shared, True), repeat)),
+            ("ActionRateThrottle.allow_request, local", measure(allow_request, repeat)),
+        ], unit='µs')
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        enabled = measure(lambda: client.get('/api/candidates/'), repeat)
+    disabled = measure(lambda: client.get('/api/candidates/'), repeat)
+
+    write_table(out, "Authenticated GET /api/candidates/", [
+        ("throttling enabled", enabled),
+        ("throttling disabled", disabled),
+    ])
+
+
+@suite('singleflight', "Waves of --size identical concurrent list requests, with and without coalescing")
+def bench_singleflight(options, out):
+    import threading
+
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    from . import singleflight
+
+    seed_candidates(options['rows'])
+    _, token = bench_user()
+    threads = max(2, options['size'])
+    # Default list page and the heavier search + facets page
+    queries = [
+        ("default list", {}),
+        ("search + facets", {'search': 'candidate 1', 'facets': 'status,position_applied'}),
+    ]
+
+    def wave(params):
+        barrier = threading.Barrier(threads)
+
+        def request():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+            barrier.wait()
+            try:
+                client.get('/api/candidates/', params)
+            finally:
+                connection.close()
+
+        def call():
+            workers = [threading.Thread(target=request) for _ in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        return call
+
+    rows = []
+    for label, params in queries:
+        for enabled in (False, True):
+            singleflight.groups.clear()
+            # Facet caching would hide the repeated queries
+            with override_settings(SINGLE_FLIGHT={'ENABLED': enabled, 'TIMEOUT': 5.0}, FACETS_CACHE_TIMEOUT=0):
+                timings = measure(wave(params), options['repeat'])
+            if enabled:
+                counts = singleflight.metrics().get('candidate-list', {})
+                suffix = f"coalescing ({counts.get('coalesced', 0)}/{counts.get('coalesced', 0) + counts.get('leaders', 0)} shared)"
+            else:
+                suffix = "no coalescing"
+            rows.append((f"{label}, {suffix}", timings))
+
+    write_table(out, f"Wall time of {threads} simultaneous GET /api/candidates/ over {options['rows']} candidates", rows)
+
+
+@suite('analytics', "Grouped report counts from SQL vs the columnar snapshot, and snapshot refresh cost")
+def bench_analytics(options, out):
+    from django.db.models import Count, F
+    from django.db.models.functions import TruncWeek
+    from rest_framework.test import APIClient
+
+    from . import analytics, counters
+
+    seed_candidates(options['rows'])
+    spread_created_at()
+    # Changes made before the snapshot was built are not re-read
+    Candidate.objects.update(updated_at=F('created_at'))
+    counters.rebuild()
+    _, token = bench_user()
+    repeat = options['repeat']
+    live = Candidate.objects.filter(is_archived=False).order_by()
+
+    def sql_weekly():
+        rows = (
+            live.annotate(week=TruncWeek('created_at'))
+            .values('week', 'position_id', 'status')
+            .annotate(total=Count('id'))
+        )
+        return {
+            (row['week'].date().isoformat(), positions.get_position_name(row['position_id']), row['status']): row['total']
+            for row in rows
+        }
+
+    def sql_status():
+        return dict(live.values_list('status').annotate(total=Count('id')))
+
+    snapshot = analytics.Snapshot.build()
+
+    def snapshot_weekly():
+        return {
+            (row['bucket'], row['position_applied'], row['status']): row['count']
+            for row in snapshot.query(['position_applied', 'status'], 'week')
+        }
+
+    def snapshot_status():
+        return {row['status']: row['count'] for row in snapshot.query(['status'])}
+
+    if sql_weekly() != snapshot_weekly() or sql_status() != snapshot_status():
+        out.write("Snapshot results differ from SQL!\n")
+
+    engine = 'numpy' if analytics.get_numpy() is not None else 'pure Python'
+    write_table(out, f"Candidates per week, position and status, {options['rows']} candidates", [
+        ("SQL GROUP BY", measure(sql_weekly, repeat)),
+        (f"snapshot ({engine})", measure(snapshot_weekly, repeat)),
+    ])
+    write_table(out, f"Candidates per status, {options['rows']} candidates", [
+        ("SQL GROUP BY", measure(sql_status, repeat)),
+        (f"snapshot ({engine})", measure(snapshot_status, repeat)),
+    ])
+
+    ids = list(Candidate.objects.values_list('id', flat=True)[:options['rows']:max(1, options['rows'] // 100)])
+
+    def refresh():
+        # 100 status changes since the last refresh
+        counters.update_status(Candidate.objects.filter(id__in=ids), random.choice(STATUSES))
+        working = snapshot.copy()
+        started = time.perf_counter()
+        working.update()
+        return (time.perf_counter() - started) * 1000
+
+    def reconcile():
+        working = snapshot.copy()
+        started = time.perf_counter()
+        working.reconcile()
+        return (time.perf_counter() - started) * 1000
+
+    refreshes = [refresh() for _ in range(min(repeat, 20))]
+    write_table(out, f"Snapshot refresh, {options['rows']} candidates ({snapshot.nbytes // 1024} KiB)", [
+        ("full build", measure(analytics.Snapshot.build, min(repeat, 10), warmup=1)),
+        (f"incremental, {len(ids)} changed rows", refreshes),
+        ("id reconciliation", [reconcile() for _ in range(min(repeat, 10))]),
+    ])
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    analytics.clear()
+    write_table(out, "GET /api/candidates/analytics/", [
+        ("group_by=position_applied,status&bucket=week", measure(
+            lambda: client.get('/api/candidates/analytics/', {'group_by': 'position_applied,status', 'bucket': 'week'}),
+            repeat,
+        )),
+    ])
+    analytics.clear()
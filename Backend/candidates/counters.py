@@ -0,0 +1,150 @@
+"""
+Maintained candidate counts per (status, position).
+
+Single row changes are tracked by the signal handlers in
+``candidates/signals.py``. Bulk operations that bypass signals (bulk_create,
+queryset.update) must report their changes through ``add_candidates`` and
+``update_status``; archiving goes through ``set_archived`` and bulk deletes
+through ``delete_candidates``. Archived
+candidates are not counted. ``rebuild`` recomputes everything from scratch and is
+also available as the ``rebuild_candidate_counters`` background job.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Candidate, CandidateCounter
+
+
+def adjust(status, position_id, delta):
+    """
+    Add ``delta`` to the counter of one (status, position) pair
+    """
+    if not delta or status is None or position_id is None:
+        return
+
+    counters = CandidateCounter.objects.filter(status=status, position_id=position_id)
+    if counters.update(count=F('count') + delta):
+        return
+
+    try:
+        with transaction.atomic():
+            CandidateCounter.objects.create(status=status, position_id=position_id, count=delta)
+    except IntegrityError:
+        # Created by a concurrent request in the meantime
+        counters.update(count=F('count') + delta)
+
+
+def apply_changes(changes):
+    """
+    Apply a mapping of (status, position_id) -> delta
+    """
+    for (status, position_id), delta in changes.items():
+        adjust(status, position_id, delta)
+
+
+def add_candidates(candidates):
+    """
+    Count candidates inserted with bulk_create
+    """
+    apply_changes(Counter(
+        candidate.counter_key() for candidate in candidates if not candidate.is_archived
+    ))
+
+
+def update_status(queryset, new_status):
+    """
+    Set the status of all candidates in ``queryset`` with one UPDATE and
+    move their counts to the new status.
+
+    Must be called inside a transaction so the counts taken before the
+    update match the rows it changes.
+    """
+    changes = Counter()
+    grouped = (
+        queryset.filter(is_archived=False)
+        .exclude(status=new_status)
+        .order_by()
+        .values('status', 'position_id')
+        .annotate(total=Count('id'))
+    )
+    for row in grouped:
+        changes[(row['status'], row['position_id'])] -= row['total']
+        changes[(new_status, row['position_id'])] += row['total']
+
+    updated = queryset.update(status=new_status, updated_at=timezone.now())
+    apply_changes(changes)
+    return updated
+
+
+def set_archived(queryset, archived):
+    """
+    Archive (or restore) all candidates in ``queryset`` with one UPDATE and
+    remove their counts (or add them back).
+
+    Must be called inside a transaction, like ``update_status``.
+    """
+    changed = queryset.exclude(is_archived=archived)
+    grouped = changed.order_by().values('status', 'position_id').annotate(total=Count('id'))
+    delta = -1 if archived else 1
+    changes = Counter({
+        (row['status'], row['position_id']): delta * row['total'] for row in grouped
+    })
+
+    updated = changed.update(is_archived=archived, updated_at=timezone.now())
+    apply_changes(changes)
+    return updated
+
+
+def delete_candidates(queryset):
+    """
+    Delete all candidates in ``queryset`` with one DELETE and remove their
+    counts, without loading the rows or sending per-row signals.
+
+    Must be called inside a transaction, like ``update_status``.
+    """
+    grouped = (
+        queryset.filter(is_archived=False)
+        .order_by()
+        .values('status', 'position_id')
+        .annotate(total=Count('id'))
+    )
+    changes = Counter({
+        (row['status'], row['position_id']): -row['total'] for row in grouped
+    })
+
+    # Nothing references candidates, so no cascades or collector are needed
+    deleted = queryset.order_by().select_related(None)._raw_delete(queryset.db)
+    apply_changes(changes)
+    return deleted
+
+
+def rebuild():
+    """
+    Recompute all counters with one grouped query over the candidates
+    """
+    grouped = (
+        Candidate.objects.filter(is_archived=False)
+        .order_by()
+        .values('status', 'position_id')
+        .annotate(total=Count('id'))
+    )
+    with transaction.atomic():
+        CandidateCounter.objects.all().delete()
+        CandidateCounter.objects.bulk_create([
+            CandidateCounter(status=row['status'], position_id=row['position_id'], count=row['total'])
+            for row in grouped
+        ])
+
+
+def grouped_counts():
+    """
+    Return ``[(status, position_id, count)]`` for all non-empty counters
+    """
+    return list(
+        CandidateCounter.objects.filter(count__gt=0)
+        .values_list('status', 'position_id', 'count')
+    )
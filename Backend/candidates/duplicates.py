@@ -0,0 +1,168 @@
+"""
+Duplicate applicant detection service.
+
+Candidates are only compared against rows that share one of the indexed
+blocking keys (normalised phone, phonetic name key, email local part), so
+checking a new applicant costs a few index lookups instead of a table scan.
+"""
+
+import logging
+import multiprocessing
+import time
+from collections import deque
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+from .matching import KEY_FIELDS, score_block, score_blocks, score_pair
+from .models import Candidate
+
+logger = logging.getLogger(__name__)
+
+# Defaults, can be overridden with the DUPLICATE_DETECTION setting
+DEFAULTS = {
+    'THRESHOLD': 0.6,
+    'LATENCY_BUDGET_MS': 50,
+    'MAX_BLOCK_SIZE': 500,
+}
+
+MATCH_FIELDS = ['id', 'name', 'email', 'phone'] + KEY_FIELDS
+
+
+def get_setting(name):
+    return getattr(settings, 'DUPLICATE_DETECTION', {}).get(name, DEFAULTS[name])
+
+
+def find_candidate_duplicates(candidate, threshold=None, budget_ms=None):
+    """
+    Find likely duplicates of a single saved candidate.
+
+    Scoring stops once the latency budget is spent. Returns a tuple of
+    (matches, complete) where matches are sorted by score, best first.
+    """
+    threshold = get_setting('THRESHOLD') if threshold is None else threshold
+    budget_ms = get_setting('LATENCY_BUDGET_MS') if budget_ms is None else budget_ms
+    deadline = time.perf_counter() + budget_ms / 1000
+
+    row = {field: getattr(candidate, field) for field in MATCH_FIELDS}
+
+    # OR of the blocking keys - each branch is served by its own index
+    query = Q()
+    for field in KEY_FIELDS:
+        if row[field]:
+            query |= Q(**{field: row[field]})
+    if not query:
+        return [], True
+
+    others = (
+        Candidate.objects.filter(query)
+        .exclude(pk=candidate.pk)
+        .values(*MATCH_FIELDS)[:get_setting('MAX_BLOCK_SIZE')]
+    )
+
+    matches = []
+    complete = True
+    for other in others:
+        if time.perf_counter() > deadline:
+            complete = False
+            break
+
+        score, reasons = score_pair(row, other)
+        if score >= threshold:
+            matches.append({
+                'id': other['id'],
+                'name': other['name'],
+                'email': other['email'],
+                'score': score,
+                'reasons': reasons,
+            })
+
+    if not complete:
+        logger.warning(
+            "Duplicate check for candidate %s exceeded %sms budget", candidate.pk, budget_ms
+        )
+
+    matches.sort(key=lambda match: match['score'], reverse=True)
+    return matches, complete
+
+
+def iter_blocks(key_field, chunk_size=2000):
+    """
+    Stream groups of candidates sharing the same value of ``key_field``.
+
+    Rows are read in key order through the index, so only one block is held
+    in memory at a time. Blocks with a single row are skipped.
+    """
+    rows = (
+        Candidate.objects.exclude(**{key_field: ''})
+        .order_by(key_field, 'id')
+        .values(*MATCH_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    block = []
+    for row in rows:
+        if block and row[key_field] != block[0][key_field]:
+            if len(block) > 1:
+                yield block
+            block = []
+        block.append(row)
+
+    if len(block) > 1:
+        yield block
+
+
+def find_duplicates(processes=None, threshold=None, key_fields=None,
+                    chunk_size=2000, max_block_size=None, blocks_per_task=64, on_skip=None):
+    """
+    Batch scan the whole table for duplicate pairs.
+
+    Blocks are streamed from the database by the calling process and handed
+    to a pool of worker processes in chunks, with a bounded number of chunks
+    in flight so memory stays flat on large tables. Yields tuples of
+    (first_id, second_id, score, reasons), each pair at most once.
+    Blocks larger than ``max_block_size`` are skipped and reported through
+    ``on_skip(key_field, key, size)`` since they are almost always junk data
+    (placeholder phone numbers and the like); pairs in them are still found
+    through their other keys.
+    """
+    threshold = get_setting('THRESHOLD') if threshold is None else threshold
+    max_block_size = max_block_size or get_setting('MAX_BLOCK_SIZE')
+    processes = processes or multiprocessing.cpu_count()
+
+    scanned = list(key_fields or KEY_FIELDS)
+
+    def tasks():
+        # Blocks of earlier key fields that were not scored, their pairs
+        # must still be reported from later blocks
+        skipped = {}
+        for key_field in scanned:
+            for block in iter_blocks(key_field, chunk_size):
+                if len(block) > max_block_size:
+                    skipped.setdefault(key_field, set()).add(block[0][key_field])
+                    if on_skip:
+                        on_skip(key_field, block[0][key_field], len(block))
+                    continue
+                yield key_field, block, threshold, scanned, skipped
+
+    if processes == 1:
+        for matches in map(score_block, tasks()):
+            yield from matches
+        return
+
+    # Workers never touch the database, but they must not inherit an open
+    # connection from the parent either
+    connections.close_all()
+    with multiprocessing.Pool(processes) as pool:
+        task_iter = tasks()
+        pending = deque()
+        while True:
+            batch = list(islice(task_iter, blocks_per_task))
+            if batch:
+                pending.append(pool.apply_async(score_blocks, (batch,)))
+            if pending and (not batch or len(pending) >= processes * 2):
+                yield from pending.popleft().get()
+            elif not batch:
+                break
@@ -0,0 +1,90 @@
+"""
+Facet counts for the candidate list (``?facets=status,position_applied``).
+
+Counts follow the usual faceted search convention: the count for each
+status applies every active filter except the status filter itself (and
+the same for position), so the UI can show a count on every filter chip.
+All facets are derived from a single grouped (status, position) query, or
+from the maintained counters when there is no search term, and cached
+briefly per filter signature.
+"""
+
+import hashlib
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.filters import SearchFilter
+
+from . import counters
+from .models import Candidate
+from .positions import get_position_id, get_position_name
+
+FACETS = ['status', 'position_applied']
+
+
+def parse_facets(value):
+    """
+    Parse the comma separated facets parameter, raises ValueError for
+    unknown facet names
+    """
+    facets = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in facets if name not in FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}. Available: {', '.join(FACETS)}")
+    return list(dict.fromkeys(facets))
+
+
+def grouped_rows(view, request, search):
+    """
+    Return ``[(status, position_id, count)]`` for the current search
+    """
+    if not search:
+        return counters.grouped_counts()
+
+    queryset = SearchFilter().filter_queryset(request, view.get_queryset(), view)
+    return list(
+        queryset.order_by()
+        .values('status', 'position_id')
+        .annotate(total=Count('id'))
+        .values_list('status', 'position_id', 'total')
+    )
+
+
+def get_facets(view, request, facets):
+    """
+    Compute the requested facet counts for a list request
+    """
+    params = request.query_params
+    search = params.get('search', '').strip()
+    status_filter = params.get('status') or None
+    position_filter = params.get('position') or None
+
+    signature = json.dumps([search, status_filter, position_filter, facets])
+    cache_key = 'candidate-facets:' + hashlib.md5(signature.encode()).hexdigest()
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    position_id = get_position_id(position_filter) if position_filter else None
+    rows = grouped_rows(view, request, search)
+    result = {}
+
+    if 'status' in facets:
+        status_counts = {value: 0 for value, _ in Candidate.STATUS_CHOICES}
+        for status, row_position_id, total in rows:
+            if position_filter is None or row_position_id == position_id:
+                status_counts[status] = status_counts.get(status, 0) + total
+        result['status'] = status_counts
+
+    if 'position_applied' in facets:
+        position_counts = Counter()
+        for status, row_position_id, total in rows:
+            if status_filter is None or status == status_filter:
+                position_counts[get_position_name(row_position_id)] += total
+        result['position_applied'] = dict(position_counts.most_common())
+
+    cache.set(cache_key, result, getattr(settings, 'FACETS_CACHE_TIMEOUT', 5))
+    return result
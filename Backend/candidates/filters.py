@@ -0,0 +1,47 @@
+from functools import reduce
+from operator import or_
+
+import django_filters
+from django.db.models import Q
+from rest_framework.filters import search_smart_split
+
+from .models import Candidate
+from .positions import get_position_id
+
+# Fields matched by ?search= on the list and by exports
+SEARCH_FIELDS = ['name', 'email']
+
+
+class CandidateFilter(django_filters.FilterSet):
+    """
+    Filters for the candidate list
+
+    - status: exact status match
+    - position: position name, case insensitive. The name is resolved to an
+      id through the position cache, so the query filters on the indexed
+      position_id column instead of comparing strings.
+    """
+    position = django_filters.CharFilter(method='filter_position')
+
+    class Meta:
+        model = Candidate
+        fields = ['status']
+
+    def filter_position(self, queryset, name, value):
+        position_id = get_position_id(value)
+        if position_id is None:
+            return queryset.none()
+        return queryset.filter(position_id=position_id)
+
+
+def search_candidates(queryset, search):
+    """
+    Search like the list's SearchFilter: the input is split into terms
+    (quoted phrases stay together) and every term must be contained in one
+    of SEARCH_FIELDS, ignoring case
+    """
+    for term in search_smart_split(search):
+        queryset = queryset.filter(
+            reduce(or_, (Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS))
+        )
+    return queryset
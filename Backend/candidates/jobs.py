@@ -0,0 +1,283 @@
+"""
+Database backed background job queue.
+
+Heavy operations (imports, exports, bulk updates) are stored as ``Job`` rows
+and executed by the ``run_workers`` management command, so no external
+broker is needed. Handlers are registered with the ``register`` decorator,
+see ``candidates/tasks.py``.
+"""
+
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Defaults, can be overridden with the JOBS setting
+DEFAULTS = {
+    'RETRY_DELAY_SECONDS': 30,
+    'STALE_AFTER_SECONDS': 600,
+    'HEARTBEAT_SECONDS': 60,
+    'PROGRESS_INTERVAL_SECONDS': 0.5,
+    'MAX_ERROR_BACKOFF_SECONDS': 60,
+}
+
+HANDLERS = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'JOBS', {}).get(name, DEFAULTS[name])
+
+
+class JobLost(Exception):
+    """
+    Raised in a handler whose job was requeued and claimed by another worker
+    """
+
+
+def register(kind, max_attempts=3):
+    """
+    Register a function as the handler for jobs of the given kind.
+
+    The handler is called as ``handler(context, payload)`` and its return
+    value is stored as the job result, so it must be JSON serialisable.
+    """
+    def decorator(func):
+        HANDLERS[kind] = (func, max_attempts)
+        return func
+    return decorator
+
+
+class JobContext:
+    """
+    Passed to job handlers for progress reporting
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._last_report = 0.0
+
+    def set_progress(self, progress, total=None, force=False):
+        """
+        Store progress on the job row, at most every PROGRESS_INTERVAL_SECONDS.
+
+        Also refreshes ``locked_at``, so jobs reporting progress are never
+        requeued as stale. Raises JobLost if the job no longer belongs to
+        this worker.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < get_setting('PROGRESS_INTERVAL_SECONDS'):
+            return
+
+        self._last_report = now
+        self.job.progress = progress
+        fields = {'progress': progress, 'locked_at': timezone.now()}
+        if total is not None:
+            self.job.total = total
+            fields['total'] = total
+        if not owned(self.job).update(**fields):
+            raise JobLost(f"Job {self.job.pk} was taken over by another worker")
+
+
+class Heartbeat:
+    """
+    Refreshes ``locked_at`` of a running job every HEARTBEAT_SECONDS from a
+    background thread, so handlers that never report progress are not
+    requeued as stale while they are still running
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"job-{job.pk}-heartbeat", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(get_setting('HEARTBEAT_SECONDS')):
+                try:
+                    if not self.beat():
+                        # Taken over, run_job finds out when it stores the outcome
+                        return
+                except DatabaseError:
+                    logger.warning("Heartbeat of job %s failed", self.job.pk, exc_info=True)
+                    close_old_connections()
+        finally:
+            # The thread's own connection
+            connection.close()
+
+    def beat(self):
+        """
+        Refresh ``locked_at``, returns False if the job is no longer ours
+        """
+        return bool(owned(self.job).update(locked_at=timezone.now()))
+
+
+def owned(job):
+    """
+    The job row, as long as it is still running on the worker that claimed it
+    """
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+
+
+def enqueue(kind, payload=None, user=None):
+    """
+    Queue a job and return it
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    _, max_attempts = HANDLERS[kind]
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def claim_job(worker_id):
+    """
+    Atomically claim the next runnable job for this worker.
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it so
+    concurrent workers never block on each other. SQLite has no row locks,
+    so there the claim is a compare-and-swap UPDATE on the status column and
+    a worker that loses the race simply tries the next job.
+    """
+    now = timezone.now()
+    runnable = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    claim = {
+        'status': Job.RUNNING,
+        'locked_by': worker_id,
+        'locked_at': now,
+        'started_at': now,
+        'attempts': F('attempts') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_id = runnable.select_for_update(skip_locked=True).values_list('id', flat=True).first()
+            if job_id is None:
+                return None
+            Job.objects.filter(pk=job_id).update(**claim)
+        return Job.objects.get(pk=job_id)
+
+    for job_id in runnable.values_list('id', flat=True)[:10]:
+        if Job.objects.filter(pk=job_id, status=Job.QUEUED).update(**claim):
+            return Job.objects.get(pk=job_id)
+
+    return None
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome.
+
+    Failed attempts are retried with exponential backoff until the job runs
+    out of attempts.
+    """
+    handler, _ = HANDLERS.get(job.kind, (None, None))
+    context = JobContext(job)
+
+    try:
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind {job.kind!r}")
+        with Heartbeat(job):
+            result = handler(context, job.payload)
+    except JobLost:
+        logger.warning("Job %s (%s) was taken over by another worker, dropping it", job.pk, job.kind)
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.kind, job.attempts)
+
+        fields = {'error': error, 'locked_by': '', 'locked_at': None}
+        if handler is not None and job.attempts < job.max_attempts:
+            delay = get_setting('RETRY_DELAY_SECONDS') * 2 ** (job.attempts - 1)
+            fields.update(status=Job.QUEUED, run_after=timezone.now() + timedelta(seconds=delay))
+        else:
+            fields.update(status=Job.FAILED, finished_at=timezone.now())
+        owned(job).update(**fields)
+        return False
+
+    updated = owned(job).update(
+        status=Job.SUCCEEDED,
+        result=result,
+        progress=context.job.progress if context.job.total is None else context.job.total,
+        error='',
+        locked_by='',
+        locked_at=None,
+        finished_at=timezone.now(),
+    )
+    if not updated:
+        logger.warning("Job %s (%s) was taken over by another worker, result dropped", job.pk, job.kind)
+    return bool(updated)
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs whose worker died while running them, i.e. running jobs
+    without a heartbeat for STALE_AFTER_SECONDS
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=get_setting('STALE_AFTER_SECONDS'))
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+
+    # Jobs that already used up their attempts are not started again
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        error='Worker stopped while running the job',
+        locked_by='',
+        locked_at=None,
+        finished_at=now,
+    )
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+
+def work(worker_id, stop_event, poll_interval=1.0, burst=False):
+    """
+    Worker loop - claim and run jobs until ``stop_event`` is set.
+
+    With ``burst`` the worker exits as soon as the queue is empty. Database
+    errors (e.g. "database is locked" on SQLite) do not end the worker: it
+    backs off, doubling the wait up to MAX_ERROR_BACKOFF_SECONDS, and tries
+    again. A job whose outcome could not be stored is requeued once it is
+    stale.
+    """
+    errors = 0
+    try:
+        while not stop_event.is_set():
+            try:
+                job = claim_job(worker_id)
+                if job is None:
+                    if burst:
+                        break
+                    stop_event.wait(poll_interval)
+                    continue
+                run_job(job)
+                errors = 0
+            except DatabaseError:
+                errors += 1
+                delay = min(poll_interval * 2 ** errors, get_setting('MAX_ERROR_BACKOFF_SECONDS'))
+                logger.exception("Worker %s hit a database error, retrying in %.1fs", worker_id, delay)
+                close_old_connections()
+                stop_event.wait(delay)
+    finally:
+        connection.close()
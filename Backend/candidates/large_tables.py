@@ -0,0 +1,210 @@
+"""
+Helpers that keep the Django admin usable on multi-million row tables.
+
+Above the ``ADMIN_LARGE_TABLES['THRESHOLD']`` row estimate the candidate
+admin switches to large table mode: page counts come from the table
+statistics instead of COUNT(*), search only matches prefixes and
+the date hierarchy is built from MIN/MAX of the indexed date column
+instead of a DISTINCT over every row.
+"""
+
+import re
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Max, Min, Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .matching import normalize_phone_prefix
+
+# Defaults, can be overridden with the ADMIN_LARGE_TABLES setting
+DEFAULTS = {
+    'THRESHOLD': 100000,
+    'MAX_EXPORT_ROWS': 100000,
+}
+
+PHONE_SEARCH = re.compile(r'^[\d\s()+.-]+$')
+
+
+def get_setting(name):
+    return getattr(settings, 'ADMIN_LARGE_TABLES', {}).get(name, DEFAULTS[name])
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Cheap estimate of the number of rows in a model's table.
+
+    PostgreSQL keeps one in its statistics. Elsewhere the highest primary
+    key is used, read from the end of the primary key index; it
+    overestimates by the number of deleted rows.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been analyzed
+        if row and row[0] >= 0:
+            return row[0]
+
+    last = model._default_manager.using(using).aggregate(last=Max('pk'))['last']
+    return last or 0
+
+
+def is_large_table(model, using='default'):
+    return estimate_row_count(model, using) >= get_setting('THRESHOLD')
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts more rows than the large table threshold.
+
+    Unfiltered lists of large tables use ``estimate_row_count``. Filtered
+    lists are counted exactly up to the threshold, which is exact for
+    small tables and keeps the count bounded on large ones.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = get_setting('THRESHOLD')
+
+        if not queryset.query.has_filters():
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate >= limit:
+                return estimate
+
+        return queryset.order_by()[:limit].count()
+
+
+def starts_with(field, prefix):
+    """
+    ``field`` starts with ``prefix``, a LIKE 'prefix%'.
+
+    On PostgreSQL this is served by the varchar_pattern_ops indexes of the
+    searched columns (and the one Django adds for the unique email), which
+    match byte-wise whatever the database collation. SQLite's LIKE ignores
+    case and is not served by the plain indexes there.
+    """
+    return Q(**{f'{field}__startswith': prefix})
+
+
+def prefix_search(term):
+    """
+    Build the large table search for an admin search term.
+
+    Phone numbers search the phone key, normalised like the stored one so
+    "+91 987" finds 9876543210. Anything with an @ searches the (lowercased)
+    email, and everything else the start of the name, as typed and
+    capitalised, or of the email.
+    """
+    term = term.strip()
+    if not term:
+        return None
+
+    if PHONE_SEARCH.match(term):
+        digits = normalize_phone_prefix(term)
+        if digits:
+            return starts_with('phone_key', digits)
+
+    if '@' in term:
+        return starts_with('email', term.lower())
+
+    query = starts_with('email', term.lower())
+    for variant in {term, term.capitalize(), term.title()}:
+        query |= starts_with('name', variant)
+    return query
+
+
+class PeriodDatesQuerySet(QuerySet):
+    """
+    QuerySet whose ``datetimes()`` lists every period between the first and
+    last row instead of only the periods that contain rows.
+
+    The admin date hierarchy calls ``datetimes()`` for its year, month and
+    day links. The regular implementation is a DISTINCT over the truncated
+    date of every matching row; this one only needs MIN and MAX, which come
+    straight from the date index. Periods without rows may be listed.
+
+    ``aggregate()`` of plain MIN/MAX columns (which the date hierarchy also
+    runs) is answered with one ordered LIMIT 1 query per bound; databases
+    like SQLite scan the whole index for MIN and MAX in one query.
+    """
+
+    def aggregate(self, *args, **kwargs):
+        bounds = kwargs.values()
+        if args or not kwargs or not all(is_column_bound(bound) for bound in bounds):
+            return super().aggregate(*args, **kwargs)
+
+        result = {}
+        for alias, bound in kwargs.items():
+            field_name = bound.get_source_expressions()[0].name
+            ordering = field_name if isinstance(bound, Min) else f'-{field_name}'
+            result[alias] = (
+                self.filter(**{f'{field_name}__isnull': False})
+                .order_by(ordering)
+                .values_list(field_name, flat=True)
+                .first()
+            )
+        return result
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        first, last = bounds['first'], bounds['last']
+        if first is None or last is None:
+            return []
+
+        if settings.USE_TZ:
+            first = timezone.localtime(first, tzinfo).replace(tzinfo=None)
+            last = timezone.localtime(last, tzinfo).replace(tzinfo=None)
+
+        periods = []
+        current = truncate(first, kind)
+        while current <= last:
+            periods.append(current)
+            current = next_period(current, kind)
+
+        if settings.USE_TZ:
+            periods = [timezone.make_aware(period, tzinfo) for period in periods]
+        if order == 'DESC':
+            periods.reverse()
+        return periods
+
+
+def is_column_bound(aggregate):
+    """
+    Whether ``aggregate`` is a plain MIN or MAX of a column
+    """
+    if not isinstance(aggregate, (Min, Max)) or aggregate.filter is not None:
+        return False
+    source = aggregate.get_source_expressions()[0]
+    return isinstance(source, F)
+
+
+def truncate(value, kind):
+    """
+    Start of the year, month or day containing ``value``, as a naive datetime
+    """
+    if kind == 'year':
+        return datetime(value.year, 1, 1)
+    if kind == 'month':
+        return datetime(value.year, value.month, 1)
+    if kind == 'day':
+        return datetime(value.year, value.month, value.day)
+    raise ValueError(f"Unsupported period: {kind}")
+
+
+def next_period(value, kind):
+    if kind == 'year':
+        return value.replace(year=value.year + 1)
+    if kind == 'month':
+        if value.month == 12:
+            return value.replace(year=value.year + 1, month=1)
+        return value.replace(month=value.month + 1)
+    return datetime.fromordinal(value.toordinal() + 1)
@@ -0,0 +1,398 @@
+"""
+Load generator replaying the traffic of the Angular client.
+
+Each virtual user logs in like ``auth.service.ts`` and then works the
+candidate list like ``candidate-list.component.ts`` does: paging, typing
+into the debounced (500 ms) search box, switching the status filter,
+opening candidates, and creating, editing, re-statusing and deleting
+them. Every write is followed by the list reload the component does.
+
+Virtual users are threads with one keep-alive HTTP connection each. A ramp
+profile decides how many of them are active at any moment. Used by the
+``loadtest`` management command.
+"""
+
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+STATUSES = ['Applied', 'Interview', 'Selected', 'Rejected']
+
+POSITIONS = ['Software Engineer', 'Data Analyst', 'Product Manager', 'QA Engineer', 'DevOps Engineer']
+
+# Relative weight of each user action between two think times
+ACTIONS = {
+    'page': 30,
+    'search': 20,
+    'filter': 15,
+    'detail': 10,
+    'create': 8,
+    'update': 7,
+    'status': 7,
+    'delete': 3,
+}
+
+# Matches the debounceTime() of the search box
+SEARCH_DEBOUNCE = 0.5
+
+PAGE_SIZE = 10
+
+
+def ramp_profile(name, users, duration, ramp_up):
+    """
+    Return a function mapping seconds since start to the number of active
+    virtual users:
+
+    - constant: all users from the start
+    - linear: grow evenly to all users over ``ramp_up`` seconds
+    - step: add users in four equal steps over ``ramp_up`` seconds
+    - spike: a tenth of the users, all of them during the middle third
+    """
+    def constant(elapsed):
+        return users
+
+    def linear(elapsed):
+        if ramp_up <= 0:
+            return users
+        return min(users, max(1, round(users * elapsed / ramp_up)))
+
+    def step(elapsed):
+        if ramp_up <= 0:
+            return users
+        steps = 4
+        done = min(steps, int(elapsed / (ramp_up / steps)) + 1)
+        return users * done // steps
+
+    def spike(elapsed):
+        base = max(1, users // 10)
+        if duration / 3 <= elapsed < 2 * duration / 3:
+            return users
+        return base
+
+    profiles = {'constant': constant, 'linear': linear, 'step': step, 'spike': spike}
+    if name not in profiles:
+        raise ValueError(f"Unknown ramp profile: {name}. Available: {', '.join(profiles)}")
+    return profiles[name]
+
+
+class Stats:
+    """
+    Latencies and outcomes per endpoint, shared by all virtual users
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.throttled = defaultdict(int)
+        self.locked = defaultdict(int)
+        self.login_waits = []
+
+    def record(self, endpoint, status, elapsed_ms, body):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            if status == 429:
+                self.throttled[endpoint] += 1
+            elif status == 0 or status >= 400:
+                self.errors[endpoint] += 1
+            if status >= 500 and b'database is locked' in body:
+                self.locked[endpoint] += 1
+
+    def record_login(self, waited):
+        with self.lock:
+            self.login_waits.append(waited)
+
+    def login_report(self):
+        """
+        Logged in users and the seconds they waited out login throttling
+        """
+        with self.lock:
+            waits = list(self.login_waits)
+        return {
+            'logins': len(waits),
+            'throttled_logins': self.throttled['login'],
+            'mean_wait': statistics.fmean(waits) if waits else 0.0,
+            'max_wait': max(waits, default=0.0),
+            'total_wait': sum(waits),
+        }
+
+    def report(self, elapsed):
+        """
+        Summary rows per endpoint plus a total row
+        """
+        rows = []
+        endpoints = sorted(self.latencies)
+        for endpoint in endpoints + ['total']:
+            if endpoint == 'total':
+                timings = [value for name in endpoints for value in self.latencies[name]]
+                counts = [sum(counter.values()) for counter in (self.errors, self.throttled, self.locked)]
+            else:
+                timings = self.latencies[endpoint]
+                counts = [counter[endpoint] for counter in (self.errors, self.throttled, self.locked)]
+            if not timings:
+                continue
+            ordered = sorted(timings)
+            errors, throttled, locked = counts
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(timings),
+                'rps': len(timings) / elapsed,
+                'mean': statistics.fmean(timings),
+                'p50': percentile(ordered, 0.50),
+                'p90': percentile(ordered, 0.90),
+                'p95': percentile(ordered, 0.95),
+                'p99': percentile(ordered, 0.99),
+                'error_rate': errors / len(timings),
+                'throttled_rate': throttled / len(timings),
+                'locked_rate': locked / len(timings),
+            })
+        return rows
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class VirtualUser:
+    """
+    One recruiter using the UI, see the module docstring
+    """
+
+    def __init__(self, base_url, username, password, stats, rng):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.connection = None
+
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.rng = rng
+
+        self.token = None
+        self.rows = []
+        self.total = 0
+        self.created = []
+
+    def request(self, endpoint, method, path, data=None, record=True):
+        """
+        Send one request, returns ``(status, parsed json or None, headers)``.
+        Status 0 means the connection failed.
+        """
+        headers = {'Accept': 'application/json'}
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Token {self.token}'
+
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = self.connection_class(self.netloc, timeout=30)
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            content = response.read()
+            status, response_headers = response.status, dict(response.getheaders())
+        except (OSError, http.client.HTTPException):
+            self.close()
+            status, content, response_headers = 0, b'', {}
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if record:
+            self.stats.record(endpoint, status, elapsed, content)
+        try:
+            payload = json.loads(content) if content else None
+        except ValueError:
+            payload = None
+        return status, payload, response_headers
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def login(self, stop_event):
+        """
+        Log in, waiting out login throttling like a patient user would.
+        The time spent waiting is recorded separately.
+        """
+        waited = 0.0
+        while not stop_event.is_set():
+            status, payload, headers = self.request(
+                'login', 'POST', '/api/login/', {'username': self.username, 'password': self.password}
+            )
+            if status == 200:
+                self.token = payload['token']
+                self.stats.record_login(waited)
+                return True
+            if status != 429:
+                return False
+            started = time.monotonic()
+            stop_event.wait(float(headers.get('Retry-After', 1)))
+            waited += time.monotonic() - started
+        return False
+
+    def logout(self):
+        self.request('logout', 'POST', '/api/logout/', {})
+        self.token = None
+
+    def load_list(self, endpoint='list', page=1, search='', status=''):
+        params = {'page': page}
+        if search:
+            params['search'] = search
+        if status:
+            params['status'] = status
+        code, payload, _ = self.request(endpoint, 'GET', '/api/candidates/?' + urlencode(params))
+        if code == 200:
+            self.rows = payload['results']
+            self.total = payload['count']
+
+    def pick_row(self):
+        return self.rng.choice(self.rows) if self.rows else None
+
+    def candidate_form(self, row=None):
+        """
+        Body the candidate form sends on create and on update
+        """
+        token = uuid.uuid4().hex[:12]
+        form = {
+            'name': f"Load Test {token}",
+            'email': f"loadtest-{token}@example.com",
+            'phone': ''.join(self.rng.choice('0123456789') for _ in range(10)),
+            'position_applied': self.rng.choice(POSITIONS),
+            'status': 'Applied',
+        }
+        if row is not None:
+            form.update({key: row[key] for key in ('name', 'email', 'phone', 'position_applied', 'status')})
+            form['position_applied'] = self.rng.choice(POSITIONS)
+        return form
+
+    def run_action(self, action):
+        if action == 'page':
+            pages = max(1, -(-self.total // PAGE_SIZE))
+            self.load_list(page=self.rng.randint(1, min(pages, 50)))
+
+        elif action == 'search':
+            row = self.pick_row()
+            term = row['name'] if row else 'Candidate'
+            # A pause while typing lets the debounce fire on a partial term
+            if len(term) > 3 and self.rng.random() < 0.3:
+                self.load_list('list search', search=term[:self.rng.randint(2, len(term) - 1)])
+                time.sleep(SEARCH_DEBOUNCE)
+            self.load_list('list search', search=term)
+
+        elif action == 'filter':
+            self.load_list('list status', status=self.rng.choice(STATUSES))
+
+        elif action == 'detail':
+            row = self.pick_row()
+            if row:
+                self.request('detail', 'GET', f"/api/candidates/{row['id']}/")
+
+        elif action == 'create':
+            status, payload, _ = self.request('create', 'POST', '/api/candidates/', self.candidate_form())
+            if status == 201:
+                self.created.append(payload['data']['id'])
+            self.load_list()
+
+        elif action == 'update':
+            row = self.pick_row()
+            if row:
+                self.request('update', 'PUT', f"/api/candidates/{row['id']}/", self.candidate_form(row))
+                self.load_list()
+
+        elif action == 'status':
+            row = self.pick_row()
+            if row:
+                self.request('status', 'PATCH', f"/api/candidates/{row['id']}/status/",
+                             {'status': self.rng.choice(STATUSES)})
+                self.load_list()
+
+        elif action == 'delete':
+            # Only delete what this user created, so the data set stays put
+            if self.created:
+                self.request('delete', 'DELETE', f"/api/candidates/{self.created.pop()}/")
+                self.load_list()
+
+    def cleanup(self):
+        """
+        Delete the remaining candidates this user created, not recorded
+        """
+        for pk in self.created:
+            self.request('cleanup', 'DELETE', f"/api/candidates/{pk}/", record=False)
+        self.created = []
+
+
+def run_user(index, options, stats, active_users, started, stop_event):
+    """
+    Thread body of one virtual user
+    """
+    rng = random.Random(options['seed'] + index)
+    username = options['username'] or f"{options['user_prefix']}{index}"
+    user = VirtualUser(options['url'], username, options['password'], stats, rng)
+    actions, weights = zip(*ACTIONS.items())
+
+    try:
+        while not stop_event.is_set():
+            if index >= active_users(time.monotonic() - started):
+                # Inactive in the current phase of the ramp profile
+                stop_event.wait(0.2)
+                continue
+
+            if user.token is None:
+                if not user.login(stop_event):
+                    stop_event.wait(1)
+                    continue
+                user.load_list()
+
+            user.run_action(rng.choices(actions, weights)[0])
+            stop_event.wait(rng.expovariate(1 / options['think_time']) if options['think_time'] > 0 else 0)
+    finally:
+        if user.token:
+            if not options['keep_data']:
+                user.cleanup()
+            user.logout()
+        user.close()
+
+
+def run(options):
+    """
+    Run the load test and return ``(rows, elapsed seconds, login summary)``.
+
+    ``options`` holds url, users, duration, ramp, ramp_up, think_time,
+    username, user_prefix, password, keep_data and seed.
+    """
+    stats = Stats()
+    active_users = ramp_profile(options['ramp'], options['users'], options['duration'], options['ramp_up'])
+    stop_event = threading.Event()
+    started = time.monotonic()
+
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(index, options, stats, active_users, started, stop_event),
+            daemon=True,
+        )
+        for index in range(options['users'])
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        stop_event.wait(options['duration'])
+    finally:
+        stop_event.set()
+        elapsed = time.monotonic() - started
+        for thread in threads:
+            thread.join()
+
+    return stats.report(elapsed), elapsed, stats.login_report()
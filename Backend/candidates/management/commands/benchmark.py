@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.benchmarks import SUITES, bench_database
+
+
+class Command(BaseCommand):
+    help = "Runs performance benchmarks against a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "suites",
+            nargs="*",
+            help="Benchmark suites to run (default: all)",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List the available suites and exit",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Number of candidates to generate",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Number of timed repetitions per measurement",
+        )
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=10,
+            help="Suite specific size, e.g. number of ids fetched by the batch suite",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name, (_, description) in SUITES.items():
+                self.stdout.write(f"{name:<16}{description}")
+            return
+
+        names = options["suites"] or list(SUITES)
+        unknown = [name for name in names if name not in SUITES]
+        if unknown:
+            raise CommandError(f"Unknown suites: {', '.join(unknown)}. Use --list to see them.")
+
+        for name in names:
+            func, description = SUITES[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}: {description}"))
+            with bench_database():
+                func(options, self.stdout)
+            self.stdout.write("")
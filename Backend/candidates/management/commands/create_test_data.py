@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from candidates.models import Candidate
+from candidates.positions import get_position_id
 
 
 class Command(BaseCommand):
@@ -134,7 +135,11 @@ class Command(BaseCommand):
         created_count = 0
         for candidate_data in sample_candidates:
             if not Candidate.objects.filter(email=candidate_data["email"]).exists():
-                Candidate.objects.create(**candidate_data)
+                position_name = candidate_data.pop("position_applied")
+                Candidate.objects.create(
+                    position_id=get_position_id(position_name, create=True),
+                    **candidate_data,
+                )
                 created_count += 1
 
         if created_count > 0:
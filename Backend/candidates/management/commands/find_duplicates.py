@@ -0,0 +1,85 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.duplicates import find_duplicates
+from candidates.matching import KEY_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Scans all candidates for likely duplicate applicants and writes the pairs as CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Number of worker processes used for scoring (default: CPU count)",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=None,
+            help="Minimum pair score to report (default: DUPLICATE_DETECTION['THRESHOLD'])",
+        )
+        parser.add_argument(
+            "--key",
+            action="append",
+            choices=KEY_FIELDS,
+            dest="keys",
+            help="Only use this blocking key, can be given more than once",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database per round trip",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            default=None,
+            help="Skip blocks with more rows than this",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Write the CSV to this file instead of stdout",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] is not None and options["processes"] < 1:
+            raise CommandError("--processes must be at least 1")
+
+        def on_skip(key_field, key, size):
+            self.stderr.write(
+                self.style.WARNING(f"Skipped {key_field}={key!r} block with {size} rows")
+            )
+
+        output = open(options["output"], "w", newline="") if options["output"] else sys.stdout
+        writer = csv.writer(output)
+        writer.writerow(["first_id", "second_id", "score", "reasons"])
+
+        started = time.perf_counter()
+        pair_count = 0
+        try:
+            for first_id, second_id, score, reasons in find_duplicates(
+                processes=options["processes"],
+                threshold=options["threshold"],
+                key_fields=options["keys"],
+                chunk_size=options["chunk_size"],
+                max_block_size=options["max_block_size"],
+                on_skip=on_skip,
+            ):
+                writer.writerow([first_id, second_id, score, "+".join(reasons)])
+                pair_count += 1
+        finally:
+            if options["output"]:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            self.style.SUCCESS(f"Found {pair_count} duplicate pairs in {elapsed:.1f}s")
+        )
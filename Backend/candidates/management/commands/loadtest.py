@@ -0,0 +1,161 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.settings import api_settings
+
+from candidates import throttling
+from candidates.loadtest import run
+
+
+class Command(BaseCommand):
+    help = "Replays the Angular client's traffic mix against a running server"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server under test",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=50,
+            help="Number of concurrent virtual users",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=60,
+            help="Seconds to run",
+        )
+        parser.add_argument(
+            "--ramp",
+            choices=["constant", "linear", "step", "spike"],
+            default="linear",
+            help="How the number of active users changes over the run",
+        )
+        parser.add_argument(
+            "--ramp-up",
+            type=float,
+            default=10,
+            help="Seconds the linear and step profiles take to reach all users",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=1.0,
+            help="Mean seconds a user waits between two actions (0 for none)",
+        )
+        parser.add_argument(
+            "--username",
+            help="Log every virtual user in as this user instead of one account each",
+        )
+        parser.add_argument(
+            "--user-prefix",
+            default="loadtest",
+            help="Virtual user N logs in as <prefix>N",
+        )
+        parser.add_argument(
+            "--password",
+            default="loadtest-password",
+            help="Password of the load test accounts",
+        )
+        parser.add_argument(
+            "--create-users",
+            action="store_true",
+            help="Create the <prefix>N accounts first (needs the server's database)",
+        )
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Keep the candidates created during the run",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed of the virtual users",
+        )
+        parser.add_argument(
+            "--json",
+            dest="json_path",
+            help="Also write the results to this JSON file",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+
+        if options["create_users"]:
+            self.create_users(options)
+        self.check_login_budget(options)
+
+        self.stdout.write(
+            f"Running {options['users']} users ({options['ramp']} ramp) against "
+            f"{options['url']} for {options['duration']:g}s..."
+        )
+        rows, elapsed, logins = run(options)
+        if not rows:
+            raise CommandError("No requests were sent, is the server running?")
+
+        self.write_report(rows, elapsed, logins)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as output:
+                json.dump(
+                    {"elapsed": elapsed, "options": options, "logins": logins, "endpoints": rows},
+                    output, indent=2, default=str,
+                )
+            self.stdout.write(f"Results written to {options['json_path']}")
+
+    def create_users(self, options):
+        """
+        Create (or reset the password of) one account per virtual user
+        """
+        for index in range(options["users"]):
+            user, _ = User.objects.get_or_create(username=f"{options['user_prefix']}{index}")
+            user.set_password(options["password"])
+            user.save()
+        self.stdout.write(f"Prepared {options['users']} load test accounts")
+
+    def check_login_budget(self, options):
+        """
+        Warn when the login budget cannot let every virtual user in. All of
+        them log in from this machine's address, and the budget is per IP.
+        Only meaningful when the server runs with the same settings.
+        """
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get("login")
+        if not throttling.get_setting("ENABLED") or rate is None:
+            return
+
+        count, period = throttling.ActionRateThrottle().parse_rate(rate)
+        reachable = int(count + options["duration"] * count / period)
+        if options["users"] > reachable:
+            self.stderr.write(self.style.WARNING(
+                f"The login budget ({rate} per IP) lets only about {reachable} of {options['users']} "
+                f"virtual users log in within {options['duration']:g}s. Run the server with "
+                f"DJANGO_SETTINGS_MODULE=application_management.settings_loadtest to lift it."
+            ))
+
+    def write_report(self, rows, elapsed, logins):
+        self.stdout.write(f"\nResults over {elapsed:.1f}s (latencies in ms)")
+        self.stdout.write(
+            f"Logins: {logins['logins']} users logged in, {logins['throttled_logins']} attempts throttled, "
+            f"waited {logins['mean_wait']:.1f}s on average (max {logins['max_wait']:.1f}s)"
+        )
+        if logins["throttled_logins"]:
+            self.stderr.write(self.style.WARNING(
+                "Logins were throttled, so fewer users than requested were active; "
+                "see the settings_loadtest profile"
+            ))
+        self.stdout.write(
+            f"{'endpoint':<14}{'requests':>9}{'req/s':>8}{'mean':>9}{'p50':>9}{'p90':>9}"
+            f"{'p95':>9}{'p99':>9}{'errors':>8}{'429':>7}{'locked':>8}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint']:<14}{row['requests']:>9}{row['rps']:>8.1f}{row['mean']:>9.1f}"
+                f"{row['p50']:>9.1f}{row['p90']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}"
+                f"{row['error_rate']:>8.1%}{row['throttled_rate']:>7.1%}{row['locked_rate']:>8.1%}"
+            )
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from candidates.jobs import requeue_stale_jobs, work
+
+
+def work_in_process(worker_id, stop_event, **kwargs):
+    """
+    Process target. Ctrl-C reaches the whole process group, so children
+    ignore SIGINT and finish their current job once the parent sets
+    ``stop_event``.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(worker_id, stop_event, **kwargs)
+
+
+class Command(BaseCommand):
+    help = "Runs background job workers for heavy candidate operations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Number of workers to start",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run workers as threads (default) or as forked processes",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before checking the queue again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new jobs",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        if options["mode"] == "process":
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise CommandError("Process mode needs fork(), use --mode thread on this platform")
+            context = multiprocessing.get_context("fork")
+            stop_event = context.Event()
+            spawn = context.Process
+            target = work_in_process
+        else:
+            stop_event = threading.Event()
+            spawn = threading.Thread
+            target = work
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs"))
+
+        # Forked workers must open their own database connections
+        connections.close_all()
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        workers = [
+            spawn(
+                target=target,
+                args=(f"{prefix}:{number}", stop_event),
+                kwargs={
+                    "poll_interval": options["poll_interval"],
+                    "burst": options["burst"],
+                },
+                daemon=True,
+            )
+            for number in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Started {len(workers)} {options['mode']} workers")
+        )
+
+        try:
+            last_check = time.monotonic()
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(timeout=1)
+                # Periodically recover jobs from workers that died mid-run
+                if time.monotonic() - last_check > 60:
+                    requeue_stale_jobs()
+                    last_check = time.monotonic()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers, waiting for running jobs to finish...")
+            stop_event.set()
+            for worker in workers:
+                worker.join()
+        finally:
+            connections.close_all()
+
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
@@ -0,0 +1,186 @@
+"""
+Blocking keys and pair scoring used for duplicate applicant detection.
+
+Everything in this module is pure Python with no database access, so the
+functions can be shipped to worker processes by the ``find_duplicates``
+management command.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+
+# Key types in the order they are checked. A pair that shares a key scanned
+# earlier is only reported from that earlier block (unless the block was
+# skipped), which keeps batch output unique.
+KEY_FIELDS = ['phone_key', 'name_key', 'email_key']
+
+# Weight of each matching signal in the final score (0.0 - 1.0)
+PHONE_WEIGHT = 0.45
+EMAIL_WEIGHT = 0.35
+NAME_WEIGHT = 0.40
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+# International prefix typed before a number, e.g. "+91 " or "0091-"
+COUNTRY_CODE = re.compile(r'^\s*(?:\+|00)\d{1,3}[\s().-]+')
+
+
+def normalize_phone(phone):
+    """
+    Keep digits only and drop a leading country code, e.g. +91 98765 43210
+    """
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-10:]
+
+
+def normalize_phone_prefix(text):
+    """
+    Digits a partially typed phone number starts the normalised phone with.
+    A separated leading country code is dropped, e.g. +91 987 -> 987.
+    """
+    text = COUNTRY_CODE.sub('', text or '', count=1)
+    digits = re.sub(r'\D', '', text)
+    return digits[-10:]
+
+
+def soundex(word):
+    """
+    Classic four character American Soundex code for a single word
+    """
+    word = ''.join(ch for ch in word.lower() if ch.isalpha())
+    if not word:
+        return ''
+
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0], '')
+    for ch in word[1:]:
+        digit = SOUNDEX_CODES.get(ch, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # 'h' and 'w' do not separate letters with the same code
+        if ch not in 'hw':
+            previous = digit
+
+    return code.ljust(4, '0')
+
+
+def fold_name(name):
+    """
+    Lowercase, strip accents and collapse whitespace in a name
+    """
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r'[^\w\s]', ' ', name.lower()).split())
+
+
+def phonetic_name_key(name):
+    """
+    Sorted Soundex codes of the name tokens, so "Sharma Amit" and
+    "Amit Sharmaa" end up in the same block
+    """
+    codes = sorted(filter(None, (soundex(token) for token in fold_name(name).split())))
+    return ' '.join(codes)[:64]
+
+
+def email_local_key(email):
+    """
+    Local part of an email without "+tags" and dots
+    """
+    local = (email or '').lower().split('@')[0]
+    return local.split('+')[0].replace('.', '')
+
+
+def blocking_keys(name, email, phone):
+    """
+    Return the blocking keys for a candidate as a dict keyed by field name
+    """
+    return {
+        'phone_key': normalize_phone(phone),
+        'name_key': phonetic_name_key(name),
+        'email_key': email_local_key(email),
+    }
+
+
+def score_pair(first, second):
+    """
+    Score how likely two candidates are the same person.
+
+    Both arguments are dicts with name, email, phone and the blocking keys.
+    Returns a tuple of (score, reasons).
+    """
+    score = 0.0
+    reasons = []
+
+    if first['phone_key'] and first['phone_key'] == second['phone_key']:
+        score += PHONE_WEIGHT
+        reasons.append('phone')
+
+    if first['email_key'] and first['email_key'] == second['email_key']:
+        score += EMAIL_WEIGHT
+        reasons.append('email')
+
+    name_ratio = SequenceMatcher(None, fold_name(first['name']), fold_name(second['name'])).ratio()
+    if first['name_key'] and first['name_key'] == second['name_key']:
+        # Same phonetic key - weight by how close the spelling is
+        score += NAME_WEIGHT * max(name_ratio, 0.75)
+        reasons.append('name')
+    elif name_ratio >= 0.85:
+        score += NAME_WEIGHT * name_ratio
+        reasons.append('name')
+
+    return round(min(score, 1.0), 3), reasons
+
+
+def score_block(args):
+    """
+    Score every pair inside one block of rows.
+
+    ``args`` is a tuple of (key_field, rows, threshold, scanned, skipped)
+    where rows are dicts as accepted by ``score_pair``, ``scanned`` the key
+    fields of the scan in order and ``skipped`` a dict of key field -> set
+    of key values whose blocks were not scored. Pairs that also share a key
+    scanned earlier are skipped since that block reports them, unless that
+    block was skipped. Runs inside worker processes, so it must stay a top
+    level function.
+    """
+    key_field, rows, threshold, scanned, skipped = args
+    earlier = [
+        (key, skipped.get(key, ()))
+        for key in scanned[:scanned.index(key_field)]
+    ]
+    matches = []
+
+    for i, first in enumerate(rows):
+        for second in rows[i + 1:]:
+            if any(
+                first[key] and first[key] == second[key] and first[key] not in not_scored
+                for key, not_scored in earlier
+            ):
+                continue
+            score, reasons = score_pair(first, second)
+            if score >= threshold:
+                low, high = sorted((first['id'], second['id']))
+                matches.append((low, high, score, reasons))
+
+    return matches
+
+
+def score_blocks(tasks):
+    """
+    Score a batch of blocks, see ``score_block``
+    """
+    matches = []
+    for task in tasks:
+        matches.extend(score_block(task))
+    return matches
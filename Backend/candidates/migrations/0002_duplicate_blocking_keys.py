@@ -0,0 +1,68 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+from candidates.matching import blocking_keys
+
+
+def populate_blocking_keys(apps, schema_editor):
+    """
+    Fill the blocking keys for existing candidates in batches
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    batch_size = 2000
+    last_id = 0
+
+    while True:
+        batch = list(
+            Candidate.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'name', 'email', 'phone')[:batch_size]
+        )
+        if not batch:
+            break
+
+        for candidate in batch:
+            for field, value in blocking_keys(candidate.name, candidate.email, candidate.phone).items():
+                setattr(candidate, field, value)
+
+        Candidate.objects.bulk_update(batch, ['phone_key', 'name_key', 'email_key'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, help_text='Normalised local part of the email address', max_length=254),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, help_text='Phonetic key of the candidate name', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, help_text='Normalised phone number', max_length=10),
+        ),
+        migrations.RunPython(populate_blocking_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['phone_key'], name='candidates__phone_k_a679ce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['name_key'], name='candidates__name_ke_5926b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['email_key'], name='candidates__email_k_67393e_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0002_duplicate_blocking_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Name of the registered job handler', max_length=50)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Succeeded', 'Succeeded'), ('Failed', 'Failed')], default='Queued', help_text='Current state of the job', max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Arguments passed to the job handler')),
+                ('result', models.JSONField(blank=True, help_text='Value returned by the job handler', null=True)),
+                ('error', models.TextField(blank=True, help_text='Traceback of the last failed attempt')),
+                ('progress', models.PositiveIntegerField(default=0, help_text='Number of items processed so far')),
+                ('total', models.PositiveIntegerField(blank=True, help_text='Total number of items, if known', null=True)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times the job has been started')),
+                ('max_attempts', models.PositiveIntegerField(default=3, help_text='Give up after this many failed attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Job is not picked up before this time (used for retry backoff)')),
+                ('locked_by', models.CharField(blank=True, help_text='Worker currently running the job', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, help_text='When the current worker claimed the job', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who queued the job', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='candidates__status_85f822_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0003_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Position',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name of the position', max_length=255, unique=True)),
+                ('key', models.CharField(editable=False, help_text='Case and whitespace insensitive lookup key', max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Position',
+                'verbose_name_plural': 'Positions',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='position',
+            field=models.ForeignKey(help_text='Job position the candidate applied for', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='candidates', to='candidates.position'),
+        ),
+    ]
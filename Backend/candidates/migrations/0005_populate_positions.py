@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+BATCH_SIZE = 2000
+
+
+def populate_positions(apps, schema_editor):
+    """
+    Create one Position per distinct position_applied value and link the
+    candidates to it. Values differing only in case or whitespace are merged.
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    Position = apps.get_model('candidates', 'Position')
+    position_ids = {}
+    last_id = 0
+
+    while True:
+        batch = list(
+            Candidate.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'position_applied')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+
+        for candidate in batch:
+            name = ' '.join(candidate.position_applied.split()) or 'Unspecified'
+            key = name.casefold()
+            if key not in position_ids:
+                position, _ = Position.objects.get_or_create(key=key, defaults={'name': name})
+                position_ids[key] = position.id
+            candidate.position_id = position_ids[key]
+
+        Candidate.objects.bulk_update(batch, ['position'])
+        last_id = batch[-1].id
+
+
+def restore_position_applied(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    Position = apps.get_model('candidates', 'Position')
+
+    for position in Position.objects.all():
+        Candidate.objects.filter(position=position).update(position_applied=position.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_position'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_positions, restore_position_applied),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0005_populate_positions'),
+    ]
+
+    operations = [
+        # Give the old column a default so the removal can be reversed on
+        # tables that already have rows
+        migrations.AlterField(
+            model_name='candidate',
+            name='position_applied',
+            field=models.CharField(default='', help_text='Job position the candidate applied for', max_length=255),
+        ),
+        migrations.RemoveField(
+            model_name='candidate',
+            name='position_applied',
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='position',
+            field=models.ForeignKey(help_text='Job position the candidate applied for', on_delete=django.db.models.deletion.PROTECT, related_name='candidates', to='candidates.position'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateCounter = apps.get_model('candidates', 'CandidateCounter')
+
+    grouped = Candidate.objects.order_by().values('status', 'position_id').annotate(total=Count('id'))
+    CandidateCounter.objects.bulk_create([
+        CandidateCounter(status=row['status'], position_id=row['position_id'], count=row['total'])
+        for row in grouped
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_remove_position_applied'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Applied', 'Applied'), ('Interview', 'Interview'), ('Selected', 'Selected'), ('Rejected', 'Rejected')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='candidates.position')),
+            ],
+            options={
+                'verbose_name': 'Candidate counter',
+                'verbose_name_plural': 'Candidate counters',
+                'constraints': [models.UniqueConstraint(fields=('status', 'position'), name='unique_candidate_counter')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
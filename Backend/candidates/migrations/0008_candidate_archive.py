@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0007_candidate_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='is_archived',
+            field=models.BooleanField(default=False, help_text='Archived candidates are hidden from the API'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['name'], name='candidates__name_ed6dc8_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0008_candidate_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['updated_at'], name='candidates__updated_31d0d2_idx'),
+        ),
+    ]
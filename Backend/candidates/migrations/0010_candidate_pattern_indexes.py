@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0009_candidate_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='candidates__phone_k_a679ce_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='candidates__name_ed6dc8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['name'], name='candidate_name_pattern_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['phone_key'], name='candidate_phone_pattern_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
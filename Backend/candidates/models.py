@@ -1,5 +1,54 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import EmailValidator, RegexValidator
+from django.utils import timezone
+
+from .matching import blocking_keys
+
+class Position(models.Model):
+    """
+    Catalogue of job positions candidates can apply for.
+    """
+    
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Display name of the position"
+    )
+    
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        editable=False,
+        help_text="Case and whitespace insensitive lookup key"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Position'
+        verbose_name_plural = 'Positions'
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def normalize_name(name):
+        """
+        Collapse whitespace in a position name
+        """
+        return ' '.join(name.split())
+    
+    @classmethod
+    def make_key(cls, name):
+        return cls.normalize_name(name).casefold()
+    
+    def save(self, *args, **kwargs):
+        self.name = self.normalize_name(self.name)
+        self.key = self.make_key(self.name)
+        super().save(*args, **kwargs)
+
 
 class Candidate(models.Model):
     """
@@ -38,8 +87,10 @@ class Candidate(models.Model):
         help_text="10-digit phone number"
     )
     
-    position_applied = models.CharField(
-        max_length=255,
+    position = models.ForeignKey(
+        Position,
+        on_delete=models.PROTECT,
+        related_name='candidates',
         help_text="Job position the candidate applied for"
     )
     
@@ -50,6 +101,11 @@ class Candidate(models.Model):
         help_text="Current status of the candidate application"
     )
     
+    is_archived = models.BooleanField(
+        default=False,
+        help_text="Archived candidates are hidden from the API"
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text="Timestamp when the candidate was added"
@@ -60,6 +116,28 @@ class Candidate(models.Model):
         help_text="Timestamp when the candidate was last updated"
     )
     
+    # Blocking keys for duplicate detection - derived from name/email/phone
+    phone_key = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        help_text="Normalised phone number"
+    )
+    
+    name_key = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Phonetic key of the candidate name"
+    )
+    
+    email_key = models.CharField(
+        max_length=254,
+        blank=True,
+        editable=False,
+        help_text="Normalised local part of the email address"
+    )
+    
     class Meta:
         ordering = ['-created_at']  # Show newest candidates first
         verbose_name = 'Candidate'
@@ -68,12 +146,195 @@ class Candidate(models.Model):
             models.Index(fields=['email']),
             models.Index(fields=['status']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
+            # Pattern indexes also serve the LIKE 'prefix%' of the large
+            # table admin search on PostgreSQL (plain indexes elsewhere)
+            models.Index(fields=['name'], name='candidate_name_pattern_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['phone_key'], name='candidate_phone_pattern_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['name_key']),
+            models.Index(fields=['email_key']),
         ]
     
     def __str__(self):
         return f"{self.name} - {self.position_applied} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the counters currently count this row as, unless
+        # fields the counters depend on were deferred
+        if all(name in instance.__dict__ for name in ('status', 'position_id', 'is_archived')):
+            instance._counted_as = instance.counter_key()
+        return instance
+    
+    def counter_key(self):
+        """
+        Counter this candidate is counted in, None for archived candidates
+        """
+        if self.is_archived:
+            return None
+        return (self.status, self.position_id)
+    
+    @property
+    def position_applied(self):
+        """
+        Name of the position, read from the in-process position cache
+        """
+        from .positions import get_position_name
+        return get_position_name(self.position_id)
+    
+    def update_blocking_keys(self):
+        """
+        Recompute the duplicate detection keys from name, email and phone
+        """
+        for field, value in blocking_keys(self.name, self.email, self.phone).items():
+            setattr(self, field, value)
+    
     def save(self, *args, **kwargs):
         # Convert email to lowercase before saving
         self.email = self.email.lower()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        self.update_blocking_keys()
+        super().save(*args, **kwargs)
+
+
+
+class CandidateCounter(models.Model):
+    """
+    Number of candidates per status and position.
+    
+    Kept up to date by signals and the bulk operations, so facet counts can
+    be read from here instead of counting the candidates table.
+    """
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Candidate.STATUS_CHOICES
+    )
+    
+    position = models.ForeignKey(
+        Position,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Candidate counter'
+        verbose_name_plural = 'Candidate counters'
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'position'], name='unique_candidate_counter'),
+        ]
+    
+    def __str__(self):
+        return f"{self.status} / {self.position_id}: {self.count}"
+
+
+class Job(models.Model):
+    """
+    Background job run by the ``run_workers`` management command.
+    """
+    
+    QUEUED = 'Queued'
+    RUNNING = 'Running'
+    SUCCEEDED = 'Succeeded'
+    FAILED = 'Failed'
+    
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    
+    kind = models.CharField(
+        max_length=50,
+        help_text="Name of the registered job handler"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        help_text="Current state of the job"
+    )
+    
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Arguments passed to the job handler"
+    )
+    
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Value returned by the job handler"
+    )
+    
+    error = models.TextField(
+        blank=True,
+        help_text="Traceback of the last failed attempt"
+    )
+    
+    progress = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of items processed so far"
+    )
+    
+    total = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Total number of items, if known"
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of times the job has been started"
+    )
+    
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        help_text="Give up after this many failed attempts"
+    )
+    
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        help_text="Job is not picked up before this time (used for retry backoff)"
+    )
+    
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker currently running the job"
+    )
+    
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the current worker claimed the job"
+    )
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='jobs',
+        help_text="User who queued the job"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Used by workers to find the next job to claim
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
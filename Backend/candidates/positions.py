@@ -0,0 +1,114 @@
+"""
+In-process cache of the Position catalogue.
+
+Serializers resolve position names through this cache instead of joining
+or querying the positions table for every candidate. The catalogue is
+small and rarely changes: local changes clear the cache through signals
+(see ``candidates/signals.py``) and entries expire after
+POSITION_CACHE_TIMEOUT seconds so renames made by other processes are
+picked up as well.
+
+The first miss on a cold cache loads the whole catalogue; after that a
+miss looks up just the one id, and ids that do not exist (e.g. deleted
+positions) are remembered until the cache is cleared.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Position
+
+_lock = threading.Lock()
+_names = {}  # position id -> name
+_ids = {}    # lookup key -> position id
+_missing = set()  # position ids known not to exist
+_complete = False  # whether the whole catalogue has been loaded
+_loaded_at = time.monotonic()
+
+
+def _check_expiry():
+    global _loaded_at
+    if time.monotonic() - _loaded_at > getattr(settings, 'POSITION_CACHE_TIMEOUT', 300):
+        clear_cache()
+        _loaded_at = time.monotonic()
+
+
+def _remember(position_id, name):
+    with _lock:
+        _names[position_id] = name
+        _ids[Position.make_key(name)] = position_id
+
+
+def clear_cache():
+    global _complete
+    with _lock:
+        _names.clear()
+        _ids.clear()
+        _missing.clear()
+        _complete = False
+
+
+def get_position_name(position_id):
+    """
+    Return the name of a position, or None if it does not exist
+    """
+    if position_id is None:
+        return None
+
+    _check_expiry()
+    name = _names.get(position_id)
+    if name is not None or position_id in _missing:
+        return name
+
+    if not _complete:
+        # The catalogue is small, so a cold cache loads all of it in one
+        # query rather than one query per position on a page of candidates
+        preload()
+        name = _names.get(position_id)
+    else:
+        # Added by another process since the catalogue was loaded
+        position = Position.objects.in_bulk([position_id]).get(position_id)
+        if position is not None:
+            name = position.name
+            _remember(position_id, name)
+
+    if name is None:
+        with _lock:
+            _missing.add(position_id)
+    return name
+
+
+def preload():
+    """
+    Load the whole catalogue into the cache
+    """
+    global _complete
+    for pk, position_name in Position.objects.values_list('id', 'name'):
+        _remember(pk, position_name)
+    _complete = True
+
+
+def get_position_id(name, create=False):
+    """
+    Look up a position id by name, ignoring case and extra whitespace.
+
+    With ``create`` a missing position is added to the catalogue, otherwise
+    None is returned for unknown names.
+    """
+    _check_expiry()
+    key = Position.make_key(name)
+    position_id = _ids.get(key)
+    if position_id is not None:
+        return position_id
+
+    if create:
+        position, _ = Position.objects.get_or_create(key=key, defaults={'name': name})
+    else:
+        position = Position.objects.filter(key=key).first()
+        if position is None:
+            return None
+
+    _remember(position.pk, position.name)
+    return position.pk
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Candidate
+from .analytics import BUCKETS, GROUP_BY
+from .models import Candidate, Job, Position
+from .positions import get_position_id, get_position_name
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -29,10 +31,47 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
+class PositionField(serializers.Field):
+    """
+    Reads and writes the candidate position as its name, so the API keeps
+    the plain ``position_applied`` string. Names are resolved through the
+    in-process position cache, so serializing a page of candidates needs no
+    join or extra query.
+    
+    Validation only normalises the name; ``CandidateSerializer`` resolves it
+    to an id (adding unknown names to the catalogue) once the whole
+    candidate is valid.
+    """
+    default_error_messages = {
+        'invalid': 'Position applied must be a string.',
+        'blank': 'Position applied cannot be empty.',
+        'max_length': 'Position applied cannot be longer than 255 characters.',
+    }
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'position_id')
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        return get_position_name(value)
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        if not data.strip():
+            self.fail('blank')
+        name = Position.normalize_name(data)
+        if len(name) > 255:
+            self.fail('max_length')
+        return name
+
+
 class CandidateSerializer(serializers.ModelSerializer):
     """
     Main serializer for Candidate model with all fields
     """
+    position_applied = PositionField()
+    
     class Meta:
         model = Candidate
         fields = [
@@ -91,14 +130,22 @@ class CandidateSerializer(serializers.ModelSerializer):
         
         return value.strip()
     
-    def validate_position_applied(self, value):
+    def resolve_position(self, validated_data):
         """
-        Validate position is not empty
+        Return validated data with the position name replaced by its id,
+        adding unknown positions to the catalogue. Only call this once the
+        data is valid, so rejected requests never create positions.
         """
-        if not value.strip():
-            raise serializers.ValidationError("Position applied cannot be empty.")
-        
-        return value.strip()
+        data = dict(validated_data)
+        if 'position_id' in data:
+            data['position_id'] = get_position_id(data['position_id'], create=True)
+        return data
+    
+    def create(self, validated_data):
+        return super().create(self.resolve_position(validated_data))
+    
+    def update(self, instance, validated_data):
+        return super().update(instance, self.resolve_position(validated_data))
 
 
 class CandidateStatusSerializer(serializers.ModelSerializer):
@@ -126,6 +173,122 @@ class CandidateListSerializer(serializers.ModelSerializer):
     """
     Lightweight serializer for list view - excludes timestamps
     """
+    position_applied = PositionField()
+    
     class Meta:
         model = Candidate
-        fields = ['id', 'name', 'email', 'phone', 'position_applied', 'status']
\ No newline at end of file
+        fields = ['id', 'name', 'email', 'phone', 'position_applied', 'status']
+
+
+class CandidateBulkStatusSerializer(serializers.Serializer):
+    """
+    Serializer for bulk status change request
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+    status = serializers.ChoiceField(choices=Candidate.STATUS_CHOICES)
+
+
+class CandidateImportSerializer(serializers.Serializer):
+    """
+    Serializer for bulk import request - rows are validated by the job
+    """
+    rows = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False
+    )
+
+
+class CandidateExportSerializer(serializers.Serializer):
+    """
+    Serializer for export request - same filters as the list endpoint
+    """
+    status = serializers.ChoiceField(choices=Candidate.STATUS_CHOICES, required=False)
+    position = serializers.CharField(required=False, allow_blank=True)
+    search = serializers.CharField(required=False, allow_blank=True)
+
+
+class CandidateAnalyticsSerializer(serializers.Serializer):
+    """
+    Serializer for analytics query parameters
+    """
+    group_by = serializers.CharField(required=False, allow_blank=True, default='')
+    bucket = serializers.ChoiceField(choices=BUCKETS, required=False)
+    status = serializers.ChoiceField(choices=Candidate.STATUS_CHOICES, required=False)
+    position = serializers.CharField(required=False, allow_blank=True)
+    created_after = serializers.DateField(required=False)
+    created_before = serializers.DateField(required=False)
+    
+    def validate_group_by(self, value):
+        """
+        Parse the comma separated list of fields to group by
+        """
+        fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in fields if name not in GROUP_BY]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(GROUP_BY)}"
+            )
+        return fields
+    
+    def validate(self, data):
+        after, before = data.get('created_after'), data.get('created_before')
+        if after and before and after > before:
+            raise serializers.ValidationError({'created_before': 'Must not be before created_after.'})
+        return data
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for background job status
+    """
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'kind',
+            'status',
+            'progress',
+            'total',
+            'attempts',
+            'max_attempts',
+            'result',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
+
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """
+    Serializer for a single sub-request of a batch
+    """
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.RegexField(r'^/api/', max_length=2000)
+    body = serializers.JSONField(required=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer for the batch request
+    """
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+    
+    def validate_requests(self, value):
+        """
+        Validate the number of sub-requests
+        """
+        from .batch import get_setting
+        
+        max_requests = get_setting('MAX_REQUESTS')
+        if len(value) > max_requests:
+            raise serializers.ValidationError(
+                f"A batch can contain at most {max_requests} requests."
+            )
+        return value
@@ -0,0 +1,51 @@
+"""
+Signal handlers keeping caches and counters in sync with the database.
+
+Connected in ``CandidatesConfig.ready``.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, positions
+from .models import Candidate, Position
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def clear_position_cache(sender, **kwargs):
+    positions.clear_cache()
+
+
+@receiver(post_save, sender=Candidate)
+def count_saved_candidate(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the candidate between counters when its status, position or
+    archived flag changed.
+
+    Updates of instances that were not loaded from the database (or loaded
+    with those fields deferred) cannot be diffed and are skipped; the
+    rebuild_candidate_counters job corrects any such drift.
+    """
+    if raw:
+        return
+
+    new = instance.counter_key()
+    if created:
+        if new:
+            counters.adjust(*new, 1)
+    elif hasattr(instance, '_counted_as'):
+        old = instance._counted_as
+        if old != new:
+            if old:
+                counters.adjust(*old, -1)
+            if new:
+                counters.adjust(*new, 1)
+    instance._counted_as = new
+
+
+@receiver(post_delete, sender=Candidate)
+def count_deleted_candidate(sender, instance, **kwargs):
+    old = instance._counted_as if hasattr(instance, '_counted_as') else instance.counter_key()
+    if old:
+        counters.adjust(*old, -1)
@@ -0,0 +1,152 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+When several requests need the same result at the same time, the first one
+(the leader) computes it and the others wait for and share it instead of
+running the same queries again. Waiting is bounded: a request that waited
+longer than the timeout, or whose leader failed, computes the result
+itself.
+
+Coalescing works across the threads of one process, which is how the
+WSGI server serves requests; separate worker processes do not share
+results. Used by ``CandidateViewSet.list`` and ``retrieve``, keyed by
+``request_key``. Counters per group are served at ``/api/metrics/``.
+"""
+
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+# Defaults, can be overridden with the SINGLE_FLIGHT setting
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 5.0,   # Seconds a request waits for the leader's result
+}
+
+# Query parameters that do not change the response
+IGNORED_PARAMS = {'format'}
+
+
+def get_setting(name):
+    return getattr(settings, 'SINGLE_FLIGHT', {}).get(name, DEFAULTS[name])
+
+
+class Call:
+    """
+    One in-flight computation shared by its waiters
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.result = None
+
+
+class SingleFlight:
+    """
+    Coalesces calls with the same key across the threads of one process
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.metrics = Counter()
+
+    def count(self, metric):
+        with self.lock:
+            self.metrics[metric] += 1
+
+    def do(self, key, fn, timeout=None):
+        """
+        Return ``fn()``, sharing the result with concurrent calls for ``key``
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if leader:
+            try:
+                call.result = fn()
+                call.ok = True
+            except BaseException:
+                self.count('errors')
+                raise
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+            self.count('leaders')
+            return call.result
+
+        if not call.done.wait(timeout):
+            self.count('timeouts')
+            return fn()
+        if not call.ok:
+            return fn()
+        self.count('coalesced')
+        return call.result
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'leaders': self.metrics['leaders'],
+                'coalesced': self.metrics['coalesced'],
+                'timeouts': self.metrics['timeouts'],
+                'errors': self.metrics['errors'],
+                'in_flight': len(self.calls),
+            }
+
+
+groups = {}
+groups_lock = threading.Lock()
+
+
+def get_group(name):
+    with groups_lock:
+        if name not in groups:
+            groups[name] = SingleFlight(name)
+        return groups[name]
+
+
+def metrics():
+    """
+    Counters of every group, for the metrics endpoint
+    """
+    with groups_lock:
+        return {name: group.snapshot() for name, group in groups.items()}
+
+
+def request_key(request, action, *args):
+    """
+    Key of a read request: the action and its arguments, the normalised
+    query parameters, the host (pagination links are absolute) and the
+    permission scope of the user.
+
+    Candidate responses only depend on the user through permissions, so
+    users with the same scope can share results.
+    """
+    params = sorted(
+        (name, value.strip())
+        for name, values in request.query_params.lists()
+        if name not in IGNORED_PARAMS
+        for value in values
+        if value.strip()
+    )
+    scope = 'staff' if request.user.is_staff else 'user'
+    return (action, args, tuple(params), request.scheme, request.get_host(), scope)
+
+
+def coalesce(request, fn, action, *args):
+    """
+    Run ``fn()`` for a read request of ``action`` (with view arguments
+    ``args``), sharing the result with identical concurrent requests. The
+    result must not be modified by the caller.
+    """
+    if not get_setting('ENABLED') or request.method != 'GET':
+        return fn()
+    group = get_group(f'candidate-{action}')
+    return group.do(request_key(request, action, *args), fn, get_setting('TIMEOUT'))
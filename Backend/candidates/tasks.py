@@ -0,0 +1,161 @@
+"""
+Background job handlers for heavy candidate operations.
+
+Imported from ``CandidatesConfig.ready`` so the handlers are registered in
+web and worker processes alike. The filters and serializers they need (and
+with them django-filter and DRF) are imported when a job runs, not when
+every process starts.
+"""
+
+import csv
+
+from django.conf import settings
+from django.db import transaction
+
+from . import counters
+from .jobs import register
+from .models import Candidate, CandidateCounter
+
+# Rows handled per database round trip
+BATCH_SIZE = 1000
+
+# Only the first few row errors are kept in the job result
+MAX_REPORTED_ERRORS = 100
+
+# CSV header and the matching columns read from the database
+EXPORT_HEADER = ['id', 'name', 'email', 'phone', 'position_applied', 'status', 'created_at', 'updated_at']
+EXPORT_FIELDS = ['id', 'name', 'email', 'phone', 'position__name', 'status', 'created_at', 'updated_at']
+
+
+def filter_candidates(payload):
+    """
+    Apply the filters (status, position, search, ids) stored in a job payload.
+    Archived candidates are left out unless ``include_archived`` is set.
+
+    Status and position go through the list's CandidateFilter and search
+    matches like the list's SearchFilter, so an export contains the rows the
+    list shows. An unknown position matches no candidates.
+    """
+    from .filters import CandidateFilter, search_candidates
+
+    queryset = Candidate.objects.all()
+
+    if not payload.get('include_archived'):
+        queryset = queryset.filter(is_archived=False)
+
+    data = {name: payload[name] for name in ('status', 'position') if payload.get(name)}
+    if data:
+        filterset = CandidateFilter(data, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValueError(f"Invalid filters: {dict(filterset.errors)}")
+        queryset = filterset.qs
+
+    if payload.get('search'):
+        queryset = search_candidates(queryset, payload['search'])
+
+    if payload.get('ids'):
+        queryset = queryset.filter(pk__in=payload['ids'])
+
+    return queryset
+
+
+@register('import_candidates', max_attempts=1)
+def import_candidates(context, payload):
+    """
+    Validate and insert a list of candidate rows in batches.
+
+    Not retried: rows inserted before a failure would be reported as
+    duplicate emails on the second attempt.
+    """
+    from .serializers import CandidateSerializer
+
+    rows = payload.get('rows', [])
+    created = 0
+    errors = []
+    seen_emails = set()
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = []
+        for index, row in enumerate(rows[start:start + BATCH_SIZE], start=start):
+            serializer = CandidateSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({'row': index, 'errors': serializer.errors})
+                continue
+
+            email = serializer.validated_data['email']
+            if email in seen_emails:
+                errors.append({'row': index, 'errors': {'email': ['Duplicate email in import.']}})
+                continue
+            seen_emails.add(email)
+
+            candidate = Candidate(**serializer.resolve_position(serializer.validated_data))
+
+            # bulk_create skips save(), so derived fields are filled here
+            candidate.update_blocking_keys()
+            batch.append(candidate)
+
+        with transaction.atomic():
+            Candidate.objects.bulk_create(batch)
+            counters.add_candidates(batch)
+        created += len(batch)
+        context.set_progress(min(start + BATCH_SIZE, len(rows)), len(rows))
+
+    return {
+        'created': created,
+        'failed': len(errors),
+        'errors': errors[:MAX_REPORTED_ERRORS],
+    }
+
+
+@register('bulk_update_status')
+def bulk_update_status(context, payload):
+    """
+    Set the status of many candidates with one UPDATE per batch of ids
+    """
+    ids = payload['ids']
+    new_status = payload['status']
+    updated = 0
+
+    for start in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            updated += counters.update_status(Candidate.objects.filter(pk__in=chunk), new_status)
+        context.set_progress(min(start + BATCH_SIZE, len(ids)), len(ids))
+
+    return {'updated': updated}
+
+
+@register('export_candidates')
+def export_candidates(context, payload):
+    """
+    Write the filtered candidates to a CSV file under EXPORT_ROOT
+    """
+    queryset = filter_candidates(payload).order_by('id')
+    total = queryset.count()
+    context.set_progress(0, total, force=True)
+
+    export_root = settings.EXPORT_ROOT
+    export_root.mkdir(parents=True, exist_ok=True)
+    file_name = f"candidates-{context.job.pk}.csv"
+
+    rows = 0
+    with open(export_root / file_name, 'w', newline='') as export_file:
+        writer = csv.writer(export_file)
+        writer.writerow(EXPORT_HEADER)
+        for values in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=BATCH_SIZE):
+            writer.writerow(values)
+            rows += 1
+            if rows % BATCH_SIZE == 0:
+                context.set_progress(rows, total)
+
+    context.set_progress(rows, force=True)
+    return {'file': file_name, 'rows': rows}
+
+
+@register('rebuild_candidate_counters')
+def rebuild_candidate_counters(context, payload):
+    """
+    Recompute the per status and position counters used for facet counts
+    """
+    counters.rebuild()
+    return {'counters': CandidateCounter.objects.count()}
@@ -1,3 +1,1191 @@
-from django.test import TestCase
+import importlib
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import timedelta
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.wsgi import get_wsgi_application
+from django.db import OperationalError, transaction
+from django.db.models import Count
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import URLResolver
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from application_management import serve
+from application_management.warmup import warm_application, warm_database
+from candidates import analytics, counters, jobs, positions, singleflight, throttling
+from candidates.analytics import Snapshot, refreshed
+from candidates.benchmarks import SUITES, run_probe
+from candidates.duplicates import find_candidate_duplicates, find_duplicates
+from candidates.large_tables import EstimatedCountPaginator, prefix_search, starts_with
+from candidates.loadtest import Stats, ramp_profile
+from candidates.management.commands.run_workers import work_in_process
+from candidates.matching import (
+    KEY_FIELDS,
+    blocking_keys,
+    email_local_key,
+    normalize_phone,
+    phonetic_name_key,
+    score_block,
+    score_pair,
+    soundex,
+)
+from candidates.models import Candidate, CandidateCounter, Job, Position
+from candidates.positions import get_position_id, get_position_name
+from candidates.serializers import CandidateSerializer, PositionField
+from candidates.singleflight import SingleFlight, coalesce, request_key
+from candidates.tasks import filter_candidates, import_candidates
+from candidates.throttling import CacheBucketStore, LocalBucketStore
+
+# Unique across deletes, unlike the row count
+emails = count()
+
+
+class CandidateTestCase(TestCase):
+    """
+    Resets the in-process caches, which survive the per-test rollback
+    """
+
+    def setUp(self):
+        positions.clear_cache()
+        throttling.local_store.clear()
+        singleflight.groups.clear()
+        analytics.clear()
+        cache.clear()
+
+    def make_candidate(self, name='Amit Sharma', email=None, phone='9876543210',
+                       position='Backend Developer', status='Applied', **fields):
+        return Candidate.objects.create(
+            name=name,
+            email=email or f'candidate{next(emails)}@example.com',
+            phone=phone,
+            position_id=positions.get_position_id(position, create=True),
+            status=status,
+            **fields
+        )
+
+    def api_client(self, staff=False):
+        user = User.objects.create_user(
+            username=f'recruiter{User.objects.count()}', password='password', is_staff=staff
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+
+def row(pk, name, email, phone):
+    return {'id': pk, 'name': name, 'email': email, 'phone': phone, **blocking_keys(name, email, phone)}
+
+
+class BlockingKeyTests(SimpleTestCase):
+
+    def test_soundex(self):
+        self.assertEqual(soundex('Robert'), 'R163')
+        self.assertEqual(soundex('Rupert'), 'R163')
+        self.assertEqual(soundex('Ashcraft'), 'A261')
+        self.assertEqual(soundex('Lee'), 'L000')
+        self.assertEqual(soundex('123'), '')
+
+    def test_phonetic_name_key_ignores_token_order_and_spelling(self):
+        self.assertEqual(phonetic_name_key('Sharma Amit'), phonetic_name_key('Amit Sharmaa'))
+        self.assertEqual(phonetic_name_key('José  Pérez'), phonetic_name_key('jose perez'))
+
+    def test_normalize_phone_drops_country_code(self):
+        self.assertEqual(normalize_phone('+91 98765 43210'), '9876543210')
+        self.assertEqual(normalize_phone(''), '')
+
+    def test_email_local_key(self):
+        self.assertEqual(email_local_key('Amit.Sharma+jobs@gmail.com'), 'amitsharma')
+
+
+class ScoreTests(SimpleTestCase):
+
+    def test_score_pair(self):
+        first = row(1, 'Amit Sharma', 'amit.sharma@x.com', '9876543210')
+        second = row(2, 'Amit Sharmaa', 'amitsharma@y.com', '9876543210')
+        score, reasons = score_pair(first, second)
+        self.assertEqual(reasons, ['phone', 'email', 'name'])
+        self.assertEqual(score, 1.0)
+
+        stranger = row(3, 'Ravi Kumar', 'ravi@x.com', '9000000000')
+        self.assertEqual(score_pair(first, stranger), (0.0, []))
+
+    def test_score_block_skips_pairs_of_earlier_scored_blocks(self):
+        rows = [
+            row(1, 'Amit Sharma', 'a@x.com', '9876543210'),
+            row(2, 'Amit Sharma', 'b@x.com', '9876543210'),
+        ]
+        self.assertEqual(score_block(('name_key', rows, 0.5, KEY_FIELDS, {})), [])
+        # Not deduped when the phone block was skipped or not scanned at all
+        skipped = {'phone_key': {'9876543210'}}
+        self.assertEqual(len(score_block(('name_key', rows, 0.5, KEY_FIELDS, skipped))), 1)
+        self.assertEqual(len(score_block(('name_key', rows, 0.5, ['name_key'], {}))), 1)
+
+
+class FindDuplicatesTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.amit = self.make_candidate('Amit Sharma', 'amit.sharma@x.com')
+        self.amit2 = self.make_candidate('Amit Sharmaa', 'amitsharma@y.com')
+        self.make_candidate('Ravi Kumar', 'ravi@x.com', phone='9000000000')
+
+    def pairs(self, **kwargs):
+        return [(first, second) for first, second, _, _ in find_duplicates(processes=1, **kwargs)]
+
+    def test_full_scan_reports_each_pair_once(self):
+        self.assertEqual(self.pairs(), [(self.amit.pk, self.amit2.pk)])
+
+    def test_scan_of_single_key(self):
+        for key in KEY_FIELDS:
+            with self.subTest(key=key):
+                self.assertEqual(self.pairs(key_fields=[key]), [(self.amit.pk, self.amit2.pk)])
+
+    def test_pairs_of_skipped_blocks_are_found_through_other_keys(self):
+        # Placeholder phone shared by everyone
+        for index in range(3):
+            self.make_candidate('Sunil Rao', f'sunil{index}@x.com')
+        skipped = []
+        pairs = self.pairs(max_block_size=3, on_skip=lambda *args: skipped.append(args))
+        self.assertEqual(skipped, [('phone_key', '9876543210', 5)])
+        self.assertIn((self.amit.pk, self.amit2.pk), pairs)
+        self.assertEqual(len(pairs), 4)
+
+    def test_find_candidate_duplicates(self):
+        matches, complete = find_candidate_duplicates(self.amit)
+        self.assertTrue(complete)
+        self.assertEqual([match['id'] for match in matches], [self.amit2.pk])
+
+
+@jobs.register('test_succeed')
+def succeed(context, payload):
+    context.set_progress(1, 2, force=True)
+    return {'echo': payload}
+
+
+@jobs.register('test_fail', max_attempts=2)
+def fail(context, payload):
+    raise RuntimeError('boom')
+
+
+@jobs.register('test_taken_over', max_attempts=1)
+def taken_over(context, payload):
+    Job.objects.filter(pk=context.job.pk).update(locked_by='other-worker')
+    context.set_progress(1, force=True)
+
+
+heartbeats = threading.Event()
+
+
+@jobs.register('test_silent', max_attempts=1)
+def silent(context, payload):
+    # Reports no progress, only the worker's heartbeat keeps the job alive
+    return heartbeats.wait(5)
+
+
+@override_settings(JOBS={'RETRY_DELAY_SECONDS': 0})
+class JobQueueTests(TestCase):
+
+    def test_enqueue_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue('no_such_job')
+
+    def test_claim_and_run(self):
+        job = jobs.enqueue('test_succeed', {'a': 1})
+        claimed = jobs.claim_job('w1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.locked_by), (job.pk, Job.RUNNING, 'w1'))
+        self.assertIsNone(jobs.claim_job('w2'))
+
+        self.assertTrue(jobs.run_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {'echo': {'a': 1}})
+        self.assertEqual((job.progress, job.locked_by), (2, ''))
+
+    def test_failed_jobs_are_retried_until_out_of_attempts(self):
+        job = jobs.enqueue('test_fail')
+        with self.assertLogs('candidates.jobs', 'ERROR'):
+            self.assertFalse(jobs.run_job(jobs.claim_job('w1')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('boom', job.error)
+
+        with self.assertLogs('candidates.jobs', 'ERROR'):
+            self.assertFalse(jobs.run_job(jobs.claim_job('w1')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_stale_jobs_are_requeued_unless_out_of_attempts(self):
+        retried = jobs.enqueue('test_fail')
+        exhausted = jobs.enqueue('test_taken_over')
+        jobs.claim_job('w1')
+        jobs.claim_job('w1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(pk=retried.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.get(pk=exhausted.pk).status, Job.FAILED)
+
+    def test_progress_is_a_heartbeat(self):
+        jobs.enqueue('test_succeed')
+        job = jobs.claim_job('w1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        jobs.JobContext(job).set_progress(1, force=True)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+
+    def test_worker_that_lost_its_job_does_not_overwrite_it(self):
+        job = jobs.enqueue('test_taken_over')
+        with self.assertLogs('candidates.jobs', 'WARNING'):
+            self.assertFalse(jobs.run_job(jobs.claim_job('w1')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.RUNNING, 'other-worker'))
+
+    def test_process_workers_ignore_sigint(self):
+        with mock.patch('signal.signal') as set_handler, \
+                mock.patch('candidates.management.commands.run_workers.work') as work:
+            work_in_process('w1', 'stop-event', burst=True)
+        set_handler.assert_called_once_with(signal.SIGINT, signal.SIG_IGN)
+        work.assert_called_once_with('w1', 'stop-event', burst=True)
+
+    def test_heartbeat_refreshes_the_lock(self):
+        jobs.enqueue('test_silent')
+        job = jobs.claim_job('w1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertTrue(jobs.Heartbeat(job).beat())
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+
+        Job.objects.update(locked_by='other-worker')
+        self.assertFalse(jobs.Heartbeat(job).beat())
+
+    @override_settings(JOBS={'HEARTBEAT_SECONDS': 0.01})
+    def test_heartbeat_runs_while_the_handler_does(self):
+        heartbeats.clear()
+        jobs.enqueue('test_silent')
+        with mock.patch.object(jobs.Heartbeat, 'beat', side_effect=lambda: heartbeats.set() or True) as beat:
+            self.assertTrue(jobs.run_job(jobs.claim_job('w1')))
+        self.assertTrue(beat.called)
+        self.assertEqual(Job.objects.get().result, True)
+
+    def test_worker_survives_database_errors(self):
+        stop_event = threading.Event()
+        outcomes = [OperationalError('database is locked'), None]
+        with mock.patch('candidates.jobs.claim_job', side_effect=outcomes) as claim, \
+                self.assertLogs('candidates.jobs', 'ERROR') as logs:
+            jobs.work('w1', stop_event, poll_interval=0, burst=True)
+        self.assertEqual(claim.call_count, 2)
+        self.assertIn('database error', logs.output[0])
+
+
+class ExportFilterTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.amit = self.make_candidate('Amit Sharma', 'amit@example.com', position='Data Analyst')
+        self.make_candidate('Amit Verma', 'verma@example.com', phone='9000000000')
+        self.make_candidate('Priya Nair', 'priya@example.com', status='Interview', position='Data Analyst')
+
+    def exported(self, **payload):
+        return list(filter_candidates(payload).order_by('pk').values_list('pk', flat=True))
+
+    def listed(self, **params):
+        response = self.api_client().get('/api/candidates/', params)
+        return sorted(row['id'] for row in response.data['results'])
+
+    def test_matches_the_list(self):
+        for params in (
+            {'search': 'amit sharma'},
+            {'search': 'amit example.com'},
+            {'search': '"Amit Verma"'},
+            {'search': 'amit', 'position': 'data analyst'},
+            {'status': 'Interview'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.exported(**params), self.listed(**params))
+                self.assertTrue(self.exported(**params))
+
+    def test_unknown_position_exports_nothing(self):
+        self.assertEqual(self.exported(position='Astronaut'), [])
+        self.assertEqual(self.exported(position='Astronaut', include_archived=True), [])
+
+
+class Context:
+    def set_progress(self, *args, **kwargs):
+        pass
+
+
+class PositionFieldTests(SimpleTestCase):
+
+    def test_validation_normalises_without_resolving(self):
+        self.assertEqual(PositionField().to_internal_value('  Data   Analyst '), 'Data Analyst')
+
+    def test_invalid_values(self):
+        field = PositionField()
+        for value in (12, '   ', 'x' * 256):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                field.to_internal_value(value)
+
+
+class PositionCatalogueTests(CandidateTestCase):
+
+    def valid_data(self, **fields):
+        return {
+            'name': 'Amit Sharma',
+            'email': 'amit@example.com',
+            'phone': '9876543210',
+            'position_applied': 'Data Analyst',
+            **fields,
+        }
+
+    def test_names_are_looked_up_ignoring_case_and_whitespace(self):
+        position_id = positions.get_position_id('Data Analyst', create=True)
+        self.assertEqual(positions.get_position_id(' data  ANALYST'), position_id)
+        self.assertIsNone(positions.get_position_id('Unknown'))
+        self.assertEqual(positions.get_position_name(position_id), 'Data Analyst')
+
+    def test_unknown_ids_do_not_reload_the_catalogue(self):
+        position_id = positions.get_position_id('Data Analyst', create=True)
+        positions.clear_cache()
+        with self.assertNumQueries(1):
+            self.assertIsNone(positions.get_position_name(position_id + 100))
+            self.assertIsNone(positions.get_position_name(position_id + 100))
+            self.assertEqual(positions.get_position_name(position_id), 'Data Analyst')
+
+        # Created elsewhere after the catalogue was loaded: one row is read
+        other = Position.objects.bulk_create([Position(name='QA Engineer', key='qa engineer')])[0]
+        with self.assertNumQueries(1):
+            self.assertEqual(positions.get_position_name(other.pk), 'QA Engineer')
+            self.assertEqual(positions.get_position_name(other.pk), 'QA Engineer')
+
+    def test_create_reuses_existing_positions(self):
+        positions.get_position_id('Data Analyst', create=True)
+        serializer = CandidateSerializer(data=self.valid_data(position_applied='data  analyst'))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        candidate = serializer.save()
+        self.assertEqual(candidate.position_applied, 'Data Analyst')
+        self.assertEqual(Position.objects.count(), 1)
+
+    def test_rejected_requests_do_not_add_positions(self):
+        response = self.api_client().post(
+            '/api/candidates/', self.valid_data(email='bad', position_applied='Ghost Role'), format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Position.objects.exists())
+
+    def test_update_changes_the_position(self):
+        candidate = self.make_candidate()
+        response = self.api_client().patch(
+            f'/api/candidates/{candidate.pk}/', {'position_applied': 'QA Engineer'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['position_applied'], 'QA Engineer')
+
+    def test_import_only_adds_positions_of_valid_rows(self):
+        result = import_candidates(Context(), {'rows': [
+            self.valid_data(position_applied='Imported'),
+            self.valid_data(position_applied='Duplicate Email'),
+            self.valid_data(email='x', position_applied='Invalid Row'),
+        ]})
+        self.assertEqual((result['created'], result['failed']), (1, 2))
+        self.assertEqual(list(Position.objects.values_list('name', flat=True)), ['Imported'])
+        self.assertEqual(Candidate.objects.get().position_applied, 'Imported')
+
+    def test_list_filter_by_position_name(self):
+        self.make_candidate(position='Data Analyst')
+        self.make_candidate(position='QA Engineer')
+        response = self.api_client().get('/api/candidates/', {'position': 'data analyst'})
+        self.assertEqual([row['position_applied'] for row in response.data['results']], ['Data Analyst'])
+
+
+class BatchReadTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.api_client()
+        self.first = self.make_candidate()
+        self.second = self.make_candidate()
+
+    def test_ids_keep_the_requested_order(self):
+        response = self.client.get('/api/candidates/', {'ids': f'{self.second.pk},999,{self.first.pk},{self.second.pk}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.second.pk, self.first.pk])
+        self.assertEqual(response.data['missing'], [999])
+
+    @override_settings(BATCH_REQUESTS={'MAX_IDS': 2})
+    def test_invalid_ids(self):
+        for ids in ('a,b', '', '1,2,3'):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.client.get('/api/candidates/', {'ids': ids}).status_code, 400)
+
+    def test_batch_runs_sub_requests_in_order(self):
+        response = self.client.post('/api/batch/', {'requests': [
+            {'method': 'GET', 'path': f'/api/candidates/{self.first.pk}/'},
+            {'method': 'PATCH', 'path': f'/api/candidates/{self.second.pk}/status/', 'body': {'status': 'Interview'}},
+            {'method': 'GET', 'path': '/api/candidates/?status=Interview'},
+            {'method': 'GET', 'path': '/api/jobs/'},
+            {'method': 'GET', 'path': '/api/nowhere/'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 400, 404])
+        self.assertEqual(results[0]['body']['id'], self.first.pk)
+        self.assertEqual([row['id'] for row in results[2]['body']['results']], [self.second.pk])
+
+    @override_settings(BATCH_REQUESTS={'MAX_REQUESTS': 1})
+    def test_too_many_sub_requests(self):
+        item = {'method': 'GET', 'path': f'/api/candidates/{self.first.pk}/'}
+        response = self.client.post('/api/batch/', {'requests': [item, item]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+
+    def test_default_suites_run_one_after_another(self):
+        # In its own process, the suites create and destroy test databases
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark', '--rows', '50', '--repeat', '1', '--size', '2'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=600,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for name in SUITES:
+            self.assertIn(f'{name}: ', result.stdout)
+
+
+class CounterTests(CandidateTestCase):
+
+    def counts(self):
+        return {
+            (status, position_id): count
+            for status, position_id, count in counters.grouped_counts()
+        }
+
+    def assertCountsMatch(self):
+        expected = self.counts()
+        counters.rebuild()
+        self.assertEqual(expected, self.counts())
+
+    def test_signals_track_single_row_changes(self):
+        candidate = self.make_candidate()
+        other = self.make_candidate(position='QA Engineer')
+        backend = get_position_id('Backend Developer')
+        self.assertEqual(self.counts(), {('Applied', backend): 1, ('Applied', other.position_id): 1})
+
+        candidate.status = 'Interview'
+        candidate.save()
+        other.delete()
+        self.assertEqual(self.counts(), {('Interview', backend): 1})
+        self.assertCountsMatch()
+
+    def test_update_status(self):
+        for status in ('Applied', 'Applied', 'Interview', 'Rejected'):
+            self.make_candidate(status=status)
+        with transaction.atomic():
+            updated = counters.update_status(Candidate.objects.exclude(status='Rejected'), 'Interview')
+        self.assertEqual(updated, 3)
+        self.assertEqual(sorted(self.counts().values()), [1, 3])
+        self.assertCountsMatch()
+
+    def test_set_archived(self):
+        first = self.make_candidate()
+        self.make_candidate()
+        queryset = Candidate.objects.filter(pk=first.pk)
+        with transaction.atomic():
+            self.assertEqual(counters.set_archived(queryset, True), 1)
+            self.assertEqual(counters.set_archived(queryset, True), 0)
+        self.assertEqual(list(self.counts().values()), [1])
+        self.assertCountsMatch()
+
+        with transaction.atomic():
+            counters.set_archived(queryset, False)
+        self.assertEqual(list(self.counts().values()), [2])
+
+    def test_rebuild_repairs_drift(self):
+        self.make_candidate()
+        CandidateCounter.objects.update(count=42)
+        counters.rebuild()
+        self.assertEqual(list(self.counts().values()), [1])
+
+
+class FacetTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.api_client()
+        self.make_candidate(status='Applied', position='Data Analyst')
+        self.make_candidate(status='Applied', position='QA Engineer')
+        self.make_candidate(status='Interview', position='Data Analyst')
+        self.make_candidate(name='Priya Nair', status='Rejected', position='QA Engineer')
+
+    def test_facets_ignore_their_own_filter(self):
+        response = self.client.get('/api/candidates/', {
+            'facets': 'status,position_applied', 'status': 'Applied', 'position': 'Data Analyst'
+        })
+        self.assertEqual(response.status_code, 200)
+        facets = response.data['facets']
+        self.assertEqual(facets['status']['Applied'], 1)
+        self.assertEqual(facets['status']['Interview'], 1)
+        self.assertEqual(facets['status']['Rejected'], 0)
+        self.assertEqual(facets['position_applied'], {'Data Analyst': 1, 'QA Engineer': 1})
+
+    def test_facets_follow_the_search(self):
+        response = self.client.get('/api/candidates/', {'facets': 'status', 'search': 'Priya'})
+        self.assertEqual(response.data['facets']['status']['Rejected'], 1)
+        self.assertEqual(response.data['facets']['status']['Applied'], 0)
+
+    def test_unknown_facet(self):
+        response = self.client.get('/api/candidates/', {'facets': 'email'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('facets', response.data['details'])
+
+
+class ApiProfileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.settings = importlib.import_module('application_management.settings_api')
+
+    def test_admin_apps_and_middleware_are_dropped(self):
+        for app in self.settings.ADMIN_ONLY_APPS:
+            self.assertNotIn(app, self.settings.INSTALLED_APPS)
+        self.assertIn('candidates', self.settings.INSTALLED_APPS)
+        self.assertFalse(any('session' in name.lower() for name in self.settings.MIDDLEWARE))
+        self.assertIn('candidates.throttling.RateLimitHeadersMiddleware', self.settings.MIDDLEWARE)
+
+    def test_json_only(self):
+        framework = self.settings.REST_FRAMEWORK
+        self.assertEqual(framework['DEFAULT_RENDERER_CLASSES'], ['rest_framework.renderers.JSONRenderer'])
+        self.assertEqual(framework['DEFAULT_PARSER_CLASSES'], ['rest_framework.parsers.JSONParser'])
+        self.assertEqual(self.settings.TEMPLATES, [])
+
+    def test_persistent_connections(self):
+        self.assertEqual(self.settings.DATABASES['default']['CONN_MAX_AGE'], 60)
+        self.assertTrue(self.settings.DATABASES['default']['CONN_HEALTH_CHECKS'])
+
+    def test_api_urls_have_no_admin(self):
+        urls = importlib.import_module('application_management.urls_api')
+        prefixes = [str(pattern.pattern) for pattern in urls.urlpatterns if isinstance(pattern, URLResolver)]
+        self.assertEqual(prefixes, ['api/'])
+
+    def test_debug_is_off(self):
+        self.assertFalse(self.settings.DEBUG)
+
+    def test_optional_features_are_not_imported_up_front(self):
+        code = (
+            "import sys, django; django.setup(); import candidates.urls; "
+            "print(sorted(name for name in ('candidates.batch', 'candidates.duplicates', "
+            "'candidates.facets', 'numpy') if name in sys.modules))"
+        )
+        completed = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'application_management.settings_api'},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(completed.stdout.strip(), '[]')
+
+    def test_probe_first_request_is_authenticated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'probe.sqlite3')
+            token = run_probe('application_management.settings', '--prepare', path)['token']
+            result = run_probe('application_management.settings_api', '--database', path, '--token', token)
+        self.assertEqual(result['first_request_status'], '200 OK')
+
+
+class LoadTestProfileTests(SimpleTestCase):
+
+    def test_login_is_not_throttled(self):
+        settings = importlib.import_module('application_management.settings_loadtest')
+        self.assertIsNone(settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['login'])
+        self.assertEqual(settings.ROOT_URLCONF, 'application_management.urls_api')
+
+
+class PrefixSearchTests(SimpleTestCase):
+
+    def test_starts_with(self):
+        self.assertEqual(starts_with('name', 'Am').children, [('name__startswith', 'Am')])
+
+    def test_blank_term(self):
+        self.assertIsNone(prefix_search('   '))
+
+    def test_phone_terms_use_the_phone_key(self):
+        for term, key in [('+91 98765-43210', '9876543210'), ('+91 987', '987'), ('0091 (98765)', '98765'),
+                          ('+919876543210', '9876543210'), ('98765 4', '987654')]:
+            with self.subTest(term=term):
+                self.assertEqual(prefix_search(term).children, [('phone_key__startswith', key)])
+
+    def test_email_terms_are_lowercased(self):
+        query = prefix_search('Amit@Example')
+        self.assertEqual(query.children, [('email__startswith', 'amit@example')])
+
+
+class LargeTableTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.make_candidate(name='Amit Sharma', phone='9876543210')
+        self.second = self.make_candidate(name='Priya Nair', phone='9123456780')
+        self.third = self.make_candidate(name='amitabh Rao', phone='9000000000')
+
+    def login_admin(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def test_prefix_search_matches_names_and_phones(self):
+        names = Candidate.objects.filter(prefix_search('amit')).values_list('name', flat=True)
+        self.assertEqual(sorted(names), ['Amit Sharma', 'amitabh Rao'])
+        self.assertEqual(list(Candidate.objects.filter(prefix_search('91234'))), [self.second])
+        self.assertEqual(list(Candidate.objects.filter(prefix_search('+91 98765'))), [self.first])
+
+    @override_settings(ADMIN_LARGE_TABLES={'THRESHOLD': 2})
+    def test_paginator_uses_the_estimate_on_large_tables(self):
+        self.second.delete()
+        # The highest primary key overestimates by the deleted row
+        paginator = EstimatedCountPaginator(Candidate.objects.all(), 10)
+        self.assertEqual(paginator.count, self.third.pk)
+        self.assertGreater(paginator.count, 2)
+        paginator = EstimatedCountPaginator(Candidate.objects.filter(name='Amit Sharma'), 10)
+        self.assertEqual(paginator.count, 1)
+
+    @override_settings(ADMIN_LARGE_TABLES={'THRESHOLD': 100})
+    def test_paginator_counts_small_tables(self):
+        self.assertEqual(EstimatedCountPaginator(Candidate.objects.all(), 10).count, 3)
+
+    @override_settings(ADMIN_LARGE_TABLES={'THRESHOLD': 1})
+    def test_changelist_in_large_table_mode(self):
+        self.login_admin()
+        for params in ({}, {'q': 'Priya'}, {'created_at__year': self.first.created_at.year}):
+            with self.subTest(params=params):
+                response = self.client.get('/admin/candidates/candidate/', params)
+                self.assertEqual(response.status_code, 200)
+        response = self.client.get('/admin/candidates/candidate/', {'q': 'Priya'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.second])
+
+    def test_archive_action_hides_candidates(self):
+        self.login_admin()
+        response = self.client.post('/admin/candidates/candidate/', {
+            'action': 'archive_selected', '_selected_action': [self.first.pk]
+        })
+        self.assertEqual(response.status_code, 302)
+        ids = [row['id'] for row in self.api_client().get('/api/candidates/').data['results']]
+        self.assertNotIn(self.first.pk, ids)
+        self.assertEqual(len(ids), 2)
+
+    def test_only_archived_candidates_are_deleted(self):
+        self.login_admin()
+        actions = self.client.get('/admin/candidates/candidate/').context['action_form'].fields['action'].choices
+        self.assertNotIn('delete_selected', [name for name, _ in actions])
+
+        counters.set_archived(Candidate.objects.filter(pk=self.first.pk), True)
+        response = self.client.post('/admin/candidates/candidate/', {
+            'action': 'delete_archived', '_selected_action': [self.first.pk, self.second.pk]
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(Candidate.objects.values_list('pk', flat=True)), {self.second.pk, self.third.pk})
+        self.assertEqual(counters.grouped_counts(), [('Applied', self.first.position_id, 2)])
+
+    def test_bulk_delete_removes_counts(self):
+        with transaction.atomic():
+            deleted = counters.delete_candidates(Candidate.objects.filter(pk__in=[self.first.pk, self.second.pk]))
+        self.assertEqual(deleted, 2)
+        self.assertEqual(counters.grouped_counts(), [('Applied', self.first.position_id, 1)])
+
+
+class LocalBucketStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = LocalBucketStore()
+        self.now = 1000.0
+        patcher = mock.patch('candidates.throttling.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_empties_and_refills(self):
+        self.assertEqual(self.store.take('user', 2, 60), (True, 1, 0, 30))
+        self.assertEqual(self.store.take('user', 2, 60)[:2], (True, 0))
+
+        allowed, remaining, wait, reset = self.store.take('user', 2, 60)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 30)
+        self.assertAlmostEqual(reset, 60)
+
+        self.now += 30
+        self.assertTrue(self.store.take('user', 2, 60)[0])
+        self.assertTrue(self.store.take('other', 2, 60)[0])
+
+    def test_cost(self):
+        self.assertEqual(self.store.take('user', 5, 60, cost=3)[:2], (True, 2))
+        allowed, remaining, wait, _ = self.store.take('user', 5, 60, cost=3)
+        self.assertEqual((allowed, remaining), (False, 2))
+        self.assertAlmostEqual(wait, 12)
+
+    @override_settings(THROTTLING={'MAX_LOCAL_KEYS': 10})
+    def test_prune_drops_full_buckets_first(self):
+        for key in range(10):
+            self.store.take(key, 2, 60)
+        self.store.take(0, 2, 60)
+        self.now += 31
+        self.store.take('new', 2, 60)
+        # Every bucket that took a single token has refilled
+        self.assertEqual(set(self.store.buckets), {0, 'new'})
+
+    @override_settings(THROTTLING={'MAX_LOCAL_KEYS': 10})
+    def test_prune_keeps_recent_buckets(self):
+        for key in range(10):
+            self.now += 1
+            self.store.take(key, 2, 60)
+        self.store.take('new', 2, 60)
+        self.assertEqual(set(self.store.buckets), {*range(1, 10), 'new'})
+        self.assertEqual(self.store.take(9, 2, 60)[:2], (True, 0))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CacheBucketStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.store = CacheBucketStore('default')
+        self.addCleanup(caches['default'].clear)
+
+    def test_budget(self):
+        results = [self.store.take('user', 3, 60) for _ in range(4)]
+        self.assertEqual([result[:2] for result in results], [(True, 2), (True, 1), (True, 0), (False, 0)])
+        self.assertGreater(results[-1][2], 0)
+        self.assertTrue(self.store.take('other', 3, 60)[0])
+
+    def test_cost(self):
+        self.assertEqual(self.store.take('user', 5, 60, cost=3)[:2], (True, 2))
+        allowed, _, wait, _ = self.store.take('user', 5, 60, cost=3)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 12, places=1)
+
+
+class ThrottleTests(CandidateTestCase):
+
+    def test_login_budget_ignores_forwarded_for(self):
+        statuses = [
+            self.client.post(
+                '/api/login/', {'username': 'nobody', 'password': 'wrong'},
+                content_type='application/json', HTTP_X_FORWARDED_FOR=f'10.0.0.{attempt}'
+            ).status_code
+            for attempt in range(11)
+        ]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
+
+    def test_rate_limit_headers(self):
+        response = self.api_client().get('/api/candidates/')
+        self.assertEqual(response['X-RateLimit-Limit'], '600')
+        self.assertEqual(response['X-RateLimit-Remaining'], '599')
+        self.assertIn('X-RateLimit-Reset', response)
+
+    def test_throttled_response(self):
+        client = self.api_client()
+        for _ in range(10):
+            client.post('/api/candidates/bulk-status/', {'ids': [1], 'status': 'Interview'}, format='json')
+        response = client.post('/api/candidates/bulk-status/', {'ids': [1], 'status': 'Interview'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'batch': '5/min'},
+    })
+    def test_batches_pay_per_read(self):
+        client = self.api_client()
+        candidate = self.make_candidate()
+        read = {'method': 'GET', 'path': f'/api/candidates/{candidate.pk}/'}
+        write = {'method': 'PATCH', 'path': f'/api/candidates/{candidate.pk}/status/', 'body': {'status': 'Interview'}}
+
+        response = client.post('/api/batch/', {'requests': [read, read, read, write]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 200, 200, 200])
+        self.assertEqual(response['X-RateLimit-Remaining'], '2')
+
+        # The reads were paid for by the batch, the write by the write budget
+        self.assertEqual(client.get('/api/candidates/')['X-RateLimit-Remaining'], '599')
+        self.assertEqual(client.patch(write['path'], write['body'], format='json')['X-RateLimit-Remaining'], '118')
+
+        response = client.post('/api/batch/', {'requests': [read, read, read]}, format='json')
+        self.assertEqual(response.status_code, 429)
+
+
+class RampProfileTests(SimpleTestCase):
+
+    def active(self, name, times, users=20, duration=90, ramp_up=40):
+        profile = ramp_profile(name, users, duration, ramp_up)
+        return [profile(elapsed) for elapsed in times]
+
+    def test_profiles(self):
+        times = [0, 10, 20, 40, 50]
+        self.assertEqual(self.active('constant', times), [20, 20, 20, 20, 20])
+        self.assertEqual(self.active('linear', times), [1, 5, 10, 20, 20])
+        self.assertEqual(self.active('step', times), [5, 10, 15, 20, 20])
+        self.assertEqual(self.active('spike', [0, 29, 30, 59, 60]), [2, 2, 20, 20, 2])
+
+    def test_no_ramp_up_starts_everyone(self):
+        self.assertEqual(self.active('linear', [0], ramp_up=0), [20])
+        self.assertEqual(self.active('step', [0], ramp_up=0), [20])
+
+    def test_unknown_profile(self):
+        with self.assertRaisesMessage(ValueError, 'Unknown ramp profile: wave'):
+            ramp_profile('wave', 10, 60, 10)
+
+
+class StatsTests(SimpleTestCase):
+
+    def test_report(self):
+        stats = Stats()
+        for elapsed_ms in range(1, 11):
+            stats.record('list', 200, elapsed_ms, b'')
+        stats.record('create', 429, 5, b'')
+        stats.record('create', 500, 7, b'database is locked')
+
+        rows = {row['endpoint']: row for row in stats.report(elapsed=2)}
+        self.assertEqual(list(rows), ['create', 'list', 'total'])
+        self.assertEqual(rows['list']['rps'], 5)
+        self.assertEqual(rows['list']['p50'], 6)
+        self.assertEqual(rows['list']['p99'], 10)
+        self.assertEqual(rows['create']['throttled_rate'], 0.5)
+        self.assertEqual(rows['create']['locked_rate'], 0.5)
+        self.assertEqual(rows['total']['requests'], 12)
+        self.assertEqual(rows['total']['error_rate'], 1 / 12)
+
+    def test_login_report(self):
+        stats = Stats()
+        self.assertEqual(stats.login_report()['mean_wait'], 0.0)
+
+        stats.record('login', 429, 1, b'')
+        for waited in (0.0, 0.0, 6.0):
+            stats.record_login(waited)
+        self.assertEqual(stats.login_report(), {
+            'logins': 3, 'throttled_logins': 1, 'mean_wait': 2.0, 'max_wait': 6.0, 'total_wait': 6.0,
+        })
+
+
+class WaitCountingEvent(threading.Event):
+    """
+    Event that records how many threads are waiting on it
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.waiters = threading.Semaphore(0)
+
+    def wait(self, timeout=None):
+        self.waiters.release()
+        return super().wait(timeout)
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def setUp(self):
+        self.group = SingleFlight('test')
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def run_concurrently(self, leader_fn, waiter_fn, waiters=3):
+        """
+        Run one leader call and ``waiters`` calls that start while it runs,
+        returns the results (or exceptions) in completion order
+        """
+        results = []
+
+        def call(fn):
+            try:
+                results.append(self.group.do('key', fn, timeout=5))
+            except Exception as e:
+                results.append(e)
+
+        def leader():
+            self.started.set()
+            self.release.wait(5)
+            return leader_fn()
+
+        threads = [threading.Thread(target=call, args=(leader,))]
+        threads[0].start()
+        self.started.wait(5)
+        event = self.group.calls['key'].done = WaitCountingEvent()
+
+        for _ in range(waiters):
+            thread = threading.Thread(target=call, args=(waiter_fn,))
+            thread.start()
+            threads.append(thread)
+        for _ in range(waiters):
+            event.waiters.acquire(timeout=5)
+
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def compute(self):
+        with self.lock:
+            self.calls += 1
+        return 'computed'
+
+    def test_waiters_share_the_leaders_result(self):
+        results = self.run_concurrently(lambda: 'shared', self.compute)
+        self.assertEqual(results, ['shared'] * 4)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.group.snapshot(), {
+            'leaders': 1, 'coalesced': 3, 'timeouts': 0, 'errors': 0, 'in_flight': 0,
+        })
+
+    def test_waiters_recompute_when_the_leader_fails(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        results = self.run_concurrently(fail, self.compute)
+        self.assertEqual(sorted(map(str, results)), ['boom', 'computed', 'computed', 'computed'])
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(self.group.snapshot()['errors'], 1)
+
+    def test_sequential_calls_are_not_cached(self):
+        self.assertEqual(self.group.do('key', self.compute), 'computed')
+        self.assertEqual(self.group.do('key', self.compute), 'computed')
+        self.assertEqual(self.calls, 2)
+
+
+class RequestKeyTests(SimpleTestCase):
+
+    def request(self, query, method='get'):
+        request = Request(getattr(RequestFactory(), method)('/api/candidates/', query))
+        request.user = AnonymousUser()
+        return request
+
+    def test_equivalent_queries_share_a_key(self):
+        first = request_key(self.request({'status': 'Applied', 'page': '2', 'format': 'json'}), 'list')
+        second = request_key(self.request({'page': '2', 'status': ' Applied ', 'search': ''}), 'list')
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, request_key(self.request({'page': '3'}), 'list'))
+        self.assertNotEqual(request_key(self.request({}), 'retrieve', '1'), request_key(self.request({}), 'retrieve', '2'))
+
+    def test_only_get_requests_are_coalesced(self):
+        group_calls = []
+        coalesce(self.request({}, 'post'), lambda: group_calls.append(1), 'list')
+        self.assertEqual(group_calls, [1])
+
+    @override_settings(SINGLE_FLIGHT={'ENABLED': False})
+    def test_disabled(self):
+        self.assertEqual(coalesce(self.request({}), lambda: 'direct', 'list'), 'direct')
+
+
+class WarmUpTests(TestCase):
+
+    def test_application_warm_up_does_not_query(self):
+        with self.assertNumQueries(0), self.assertNoLogs('application_management.warmup'):
+            timings = warm_application(get_wsgi_application())
+        self.assertEqual(list(timings), ['rest_framework', 'features', 'urls', 'serializers', 'translations', 'request'])
+
+    def test_database_warm_up_loads_positions(self):
+        positions.get_position_id('Data Analyst', create=True)
+        positions.clear_cache()
+        self.assertIn('positions', warm_database())
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(positions.get_position_id('Data Analyst'))
+
+
+class ServeTests(SimpleTestCase):
+
+    def serve(self, environ):
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch('gunicorn.app.wsgiapp.run') as run, mock.patch.object(sys, 'argv', []):
+            serve.main(['--workers', '2'])
+            run.assert_called_once_with()
+            return os.environ['DJANGO_SETTINGS_MODULE'], sys.argv
+
+    def test_defaults_to_the_api_profile(self):
+        settings_module, argv = self.serve({})
+        self.assertEqual(settings_module, 'application_management.settings_api')
+        self.assertEqual(argv, ['gunicorn', '-c', serve.CONFIG, '--workers', '2', serve.APPLICATION])
+
+    def test_explicit_settings_module_is_kept(self):
+        settings_module, _ = self.serve({'DJANGO_SETTINGS_MODULE': 'application_management.settings'})
+        self.assertEqual(settings_module, 'application_management.settings')
+
+
+class SnapshotTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.make_candidate(status='Applied', position='Data Analyst')
+        self.make_candidate(status='Applied', position='Data Analyst')
+        self.make_candidate(status='Interview', position='QA Engineer')
+        self.make_candidate(status='Rejected', position='Data Analyst', is_archived=True)
+
+    def expected(self):
+        """
+        The same counts as a GROUP BY over the live table
+        """
+        rows = (
+            Candidate.objects.filter(is_archived=False)
+            .values('status', 'position_id')
+            .annotate(total=Count('id'))
+        )
+        return {(row['status'], get_position_name(row['position_id'])): row['total'] for row in rows}
+
+    def counts(self, snapshot):
+        return {
+            (row['status'], row['position_applied']): row['count']
+            for row in snapshot.query(group_by=['status', 'position_applied'])
+        }
+
+    def test_query_matches_group_by(self):
+        snapshot = Snapshot.build()
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(self.counts(snapshot), self.expected())
+        self.assertEqual(snapshot.query(), [{'count': 3}])
+        self.assertEqual(
+            snapshot.query(group_by=['position_applied'], status='Applied'),
+            [{'position_applied': 'Data Analyst', 'count': 2}]
+        )
+        self.assertEqual(snapshot.query(status='Selected'), [])
+        self.assertEqual(snapshot.query(position_id=get_position_id('QA Engineer')), [{'count': 1}])
+
+    def test_date_buckets_and_range(self):
+        snapshot = Snapshot.build()
+        today = timezone.localdate()
+        self.assertEqual(snapshot.query(bucket='day'), [{'bucket': today.isoformat(), 'count': 3}])
+        tomorrow = analytics.day_start(today + timedelta(days=1))
+        self.assertEqual(snapshot.query(since=tomorrow), [])
+        self.assertEqual(snapshot.query(until=tomorrow), [{'count': 3}])
+
+    def test_update_applies_changes_in_place(self):
+        snapshot = Snapshot.build()
+        built_at = snapshot.built_at
+
+        first, second = Candidate.objects.filter(status='Applied')
+        first.status = 'Selected'
+        first.save()
+        with transaction.atomic():
+            counters.set_archived(Candidate.objects.filter(pk=second.pk), True)
+            counters.update_status(Candidate.objects.filter(status='Rejected'), 'Interview')
+            counters.set_archived(Candidate.objects.filter(status='Interview', is_archived=True), False)
+        self.make_candidate(status='Applied', position='DevOps Engineer')
+
+        self.assertIs(refreshed(snapshot), snapshot)
+        self.assertEqual(snapshot.built_at, built_at)
+        self.assertEqual(self.counts(snapshot), self.expected())
+        self.assertEqual(self.counts(snapshot), self.counts(Snapshot.build()))
+        self.assertEqual(len(snapshot), 5)
+
+    def test_reconciliation_finds_deletes_and_late_commits(self):
+        snapshot = Snapshot.build()
+        long_ago = timezone.now() - timedelta(hours=1)
+
+        Candidate.objects.get(status='Interview').delete()
+        # Committed by transactions that started before the snapshot's high water mark
+        Candidate.objects.filter(status='Rejected').update(status='Selected', is_archived=False, updated_at=long_ago)
+        late = self.make_candidate(status='Applied', position='DevOps Engineer')
+        Candidate.objects.filter(pk=late.pk).update(updated_at=long_ago)
+
+        with self.assertNumQueries(1):
+            self.assertIs(refreshed(snapshot), snapshot)
+        self.assertNotEqual(self.counts(snapshot), self.expected())
+
+        with override_settings(ANALYTICS={'RECONCILE_INTERVAL': 0}), self.assertLogs('candidates.analytics', 'INFO'):
+            self.assertIs(refreshed(snapshot), snapshot)
+        self.assertEqual(self.counts(snapshot), self.expected())
+        self.assertEqual(len(snapshot), 4)
+
+    @override_settings(ANALYTICS={'RECONCILE_INTERVAL': 0})
+    def test_missed_rows_below_the_newest_id_rebuild(self):
+        first = Candidate.objects.order_by('id').first()
+        pk = first.pk
+        first.delete()
+        snapshot = Snapshot.build()
+        self.make_candidate(id=pk, status='Selected')
+        Candidate.objects.filter(pk=pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        with self.assertLogs('candidates.analytics', 'INFO'):
+            rebuilt = refreshed(snapshot)
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertEqual(self.counts(rebuilt), self.expected())
+
+    def test_refresh_does_not_change_the_snapshot_in_use(self):
+        current = analytics.get_snapshot()
+        self.make_candidate(status='Selected')
+        current.checked_at -= 3600
+
+        refreshed_snapshot = analytics.get_snapshot()
+        self.assertIsNot(refreshed_snapshot, current)
+        self.assertEqual(len(current), 4)
+        self.assertEqual(len(refreshed_snapshot), 5)
+        self.assertIs(analytics.get_snapshot(), refreshed_snapshot)
+
+    def test_counter_drift_does_not_rebuild(self):
+        snapshot = Snapshot.build()
+        CandidateCounter.objects.update(count=99)
+        self.make_candidate(status='Selected')
+        self.assertIs(refreshed(snapshot), snapshot)
+        self.assertEqual(self.counts(snapshot), self.expected())
+
+    @override_settings(ANALYTICS={'REBUILD_INTERVAL': 0})
+    def test_rebuild_interval(self):
+        snapshot = Snapshot.build()
+        snapshot.built_at -= 1
+        with self.assertLogs('candidates.analytics', 'INFO'):
+            self.assertIsNot(refreshed(snapshot), snapshot)
+
+    def test_save_and_load(self):
+        snapshot = Snapshot.build()
+        with tempfile.TemporaryDirectory() as path:
+            snapshot.save(path)
+            loaded = Snapshot.load(path, snapshot.generation)
+            self.assertEqual(self.counts(loaded), self.expected())
+
+            # Mapped snapshots are read-only, refreshing works on a copy
+            self.make_candidate(status='Selected')
+            updated = refreshed(loaded.copy())
+            self.assertEqual(self.counts(updated), self.expected())
+            del loaded
+
+    def test_shared_snapshot(self):
+        with tempfile.TemporaryDirectory() as path, override_settings(ANALYTICS={'PATH': path}):
+            self.assertEqual(self.counts(analytics.get_snapshot()), self.expected())
+            analytics.clear()
+
+
+class AnalyticsEndpointTests(CandidateTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.api_client()
+        self.make_candidate(status='Applied', position='Data Analyst')
+        self.make_candidate(status='Interview', position='Data Analyst')
+
+    def test_results(self):
+        response = self.client.get('/api/candidates/analytics/', {
+            'group_by': 'status', 'position': 'data analyst', 'bucket': 'month'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['snapshot']['rows'], 2)
+        self.assertEqual(
+            [(row['status'], row['count']) for row in response.data['results']],
+            [('Applied', 1), ('Interview', 1)]
+        )
+
+    def test_unknown_position(self):
+        response = self.client.get('/api/candidates/analytics/', {'position': 'Nobody'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_parameters(self):
+        for params in ({'group_by': 'email'}, {'bucket': 'year'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/candidates/analytics/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['error'], 'Invalid input')
@@ -0,0 +1,244 @@
+"""
+Request throttling with per-user, per-action token buckets.
+
+Every API request takes a token from the bucket of its scope (see
+``ActionRateThrottle.get_scope``). Budgets are the DRF throttle rates, e.g.
+``'read': '600/min'`` allows bursts of 600 requests refilled at 10 per
+second. Buckets live in process memory by default; with the ``cache``
+backend they are kept in a Django cache shared by all workers.
+
+Anonymous and login budgets are keyed on the client IP as DRF resolves it,
+so ``REST_FRAMEWORK['NUM_PROXIES']`` must match the proxies in front of the
+app; otherwise clients can pick their own ``X-Forwarded-For``.
+
+Throttled requests get a 429 with ``Retry-After``, and
+``RateLimitHeadersMiddleware`` adds ``X-RateLimit-*`` headers to every
+response of a throttled view.
+"""
+
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# Defaults, can be overridden with the THROTTLING setting
+DEFAULTS = {
+    'ENABLED': True,
+    'BACKEND': 'local',        # 'local' (per process) or 'cache' (shared)
+    'CACHE_ALIAS': 'default',
+    'MAX_LOCAL_KEYS': 100000,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'THROTTLING', {}).get(name, DEFAULTS[name])
+
+
+class LocalBucketStore:
+    """
+    Token buckets in a dict guarded by a lock, for a single process
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, duration, cost=1):
+        """
+        Take ``cost`` tokens, returns ``(allowed, remaining, wait, reset)``
+        where ``wait`` is the seconds until enough tokens are available and
+        ``reset`` the seconds until the bucket is full again
+        """
+        rate = capacity / duration
+        now = time.monotonic()
+
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                if len(self.buckets) >= get_setting('MAX_LOCAL_KEYS'):
+                    self.prune(now)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            full_at = now + (capacity - tokens) / rate
+            self.buckets[key] = (tokens, now, full_at)
+
+        wait = 0 if allowed else (cost - tokens) / rate
+        return allowed, int(tokens), wait, full_at - now
+
+    def prune(self, now):
+        """
+        Drop buckets that have refilled completely; they are identical to a
+        new bucket. If that is not enough, drop the least recently used
+        tenth, so a flood of new keys cannot reset everyone's buckets.
+        Called with the lock held.
+        """
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket[2] > now}
+        limit = get_setting('MAX_LOCAL_KEYS')
+        if len(self.buckets) >= limit:
+            keep = limit - max(1, limit // 10)
+            recent = heapq.nlargest(keep, self.buckets.items(), key=lambda item: item[1][1])
+            self.buckets = dict(recent)
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets shared through a Django cache using the generic cell rate
+    algorithm (GCRA), which needs a single timestamp per key.
+
+    The read and write are not atomic, so concurrent requests of one user
+    on different workers may occasionally get an extra token.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, capacity, duration, cost=1):
+        interval = duration / capacity
+        now = time.time()
+
+        # Theoretical arrival time: when the bucket would be full again
+        arrival = max(self.cache.get(key, now), now) + interval * cost
+        if arrival - now > duration:
+            wait = arrival - now - duration
+            return False, 0, wait, arrival - interval * cost - now
+
+        self.cache.set(key, arrival, math.ceil(duration) + 1)
+        remaining = int((duration - (arrival - now)) / interval)
+        return True, remaining, 0, arrival - now
+
+    def clear(self):
+        self.cache.clear()
+
+
+local_store = LocalBucketStore()
+
+
+def get_store():
+    if get_setting('BACKEND') == 'cache':
+        return CacheBucketStore(get_setting('CACHE_ALIAS'))
+    return local_store
+
+
+class ActionRateThrottle(SimpleRateThrottle):
+    """
+    Throttle by user (or client IP when anonymous) and scope.
+
+    The scope is the class ``scope`` when set, else the view's
+    ``throttle_scopes`` entry for the current action, else ``read`` for
+    safe methods and ``write`` for everything else.
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        # The rate depends on the scope, which is only known per request
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+
+    def get_scope(self, request, view):
+        if self.scope:
+            return self.scope
+        action = getattr(view, 'action', None)
+        scopes = getattr(view, 'throttle_scopes', {})
+        if action in scopes:
+            return scopes[action]
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.current_scope, 'ident': ident}
+
+    def get_cost(self, request, view):
+        """
+        Tokens the request takes from its bucket
+        """
+        return 1
+
+    def allow_request(self, request, view):
+        if not get_setting('ENABLED') or getattr(request._request, 'charged_to_batch', False):
+            return True
+
+        self.current_scope = self.get_scope(request, view)
+        try:
+            self.rate = self.THROTTLE_RATES[self.current_scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No throttle rate set for the '{self.current_scope}' scope")
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        cost = min(self.get_cost(request, view), self.num_requests)
+        allowed, remaining, self.wait_seconds, reset = get_store().take(
+            self.get_cache_key(request, view), self.num_requests, self.duration, cost
+        )
+        # Picked up by RateLimitHeadersMiddleware
+        request._request.rate_limit = (self.num_requests, remaining, reset)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(ActionRateThrottle):
+    """
+    Login attempts, always keyed by client IP
+    """
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class BatchRateThrottle(ActionRateThrottle):
+    """
+    ``/api/batch/`` calls, charged one token per GET sub-request so a batch
+    costs what the separate reads it replaces would. Those sub-requests are
+    not throttled again; writes in a batch take from the ``write`` budget
+    like separate writes.
+    """
+    scope = 'batch'
+
+    def get_cost(self, request, view):
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(items, list):
+            return 1
+        reads = sum(1 for item in items if isinstance(item, dict) and item.get('method') == 'GET')
+        return max(1, reads)
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Add ``X-RateLimit-Limit``, ``X-RateLimit-Remaining`` and
+    ``X-RateLimit-Reset`` (seconds until the budget is full) to responses
+    of throttled views
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['X-RateLimit-Limit'] = str(limit)
+            response['X-RateLimit-Remaining'] = str(remaining)
+            response['X-RateLimit-Reset'] = str(math.ceil(reset))
+        return response
@@ -1,16 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CandidateViewSet, login_view, logout_view
+from .views import CandidateViewSet, JobViewSet, batch_view, login_view, logout_view, metrics_view
 
 # Create a router and register our viewset
 router = DefaultRouter()
 router.register(r'candidates', CandidateViewSet, basename='candidate')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
     # Auth endpoints
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
     
+    # Several candidate requests in one round trip
+    path('batch/', batch_view, name='batch'),
+    
+    # Internal counters, staff only
+    path('metrics/', metrics_view, name='metrics'),
+    
     # Include all candidate endpoints from router
     path('', include(router.urls)),
 ]
\ No newline at end of file
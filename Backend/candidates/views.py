@@ -1,25 +1,56 @@
+import copy
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.http import FileResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import Candidate
+from .filters import SEARCH_FIELDS, CandidateFilter
+from .jobs import enqueue
+from .models import Candidate, Job
+from .positions import get_position_id
+from .singleflight import coalesce, metrics
 from .serializers import (
     CandidateSerializer,
     CandidateStatusSerializer,
     CandidateListSerializer,
+    CandidateBulkStatusSerializer,
+    CandidateImportSerializer,
+    CandidateExportSerializer,
+    CandidateAnalyticsSerializer,
+    BatchRequestSerializer,
+    JobSerializer,
     LoginSerializer,
     UserSerializer
 )
+from .throttling import BatchRateThrottle, LoginRateThrottle
+
+# Optional features (batch, facets, duplicate detection, analytics) are
+# imported by the views that use them, so they are only loaded once a
+# process serves such a request
+
+
+def job_accepted_response(job, message):
+    """
+    202 response returned by endpoints that hand work to a background job
+    """
+    return Response({
+        'message': message,
+        'data': JobSerializer(job).data
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login_view(request):
     """
     API endpoint for user login
@@ -102,6 +133,69 @@ def logout_view(request):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([BatchRateThrottle])
+def batch_view(request):
+    """
+    API endpoint running several candidate requests in one round trip
+    POST /api/batch/
+    
+    Request body:
+    {
+        "requests": [
+            {"method": "GET", "path": "/api/candidates/1/"},
+            {"method": "PATCH", "path": "/api/candidates/2/status/", "body": {"status": "Interview"}}
+        ],
+        "parallel": false
+    }
+    
+    Sub-requests share the authentication of the batch request. With
+    "parallel": true and only GET requests they run in a thread pool.
+    
+    Response:
+    {
+        "results": [
+            {"status": int, "body": {...}}
+        ]
+    }
+    """
+    from .batch import run_batch
+    
+    serializer = BatchRequestSerializer(data=request.data)
+    
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid input', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    results = run_batch(
+        request,
+        serializer.validated_data['requests'],
+        parallel=serializer.validated_data['parallel']
+    )
+    
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """
+    API endpoint exposing internal counters, staff only
+    GET /api/metrics/
+    
+    Response:
+    {
+        "singleflight": {
+            "candidate-list": {"leaders": int, "coalesced": int, "timeouts": int, "errors": int, "in_flight": int}
+        }
+    }
+    """
+    return Response({'singleflight': metrics()}, status=status.HTTP_200_OK)
+
+
 class CandidateViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing candidates
@@ -114,25 +208,36 @@ class CandidateViewSet(viewsets.ModelViewSet):
     - PATCH  /api/candidates/{id}/     -> Partial update candidate
     - DELETE /api/candidates/{id}/     -> Delete candidate
     - PATCH  /api/candidates/{id}/status/ -> Update only status
+    - POST   /api/candidates/bulk-status/ -> Update status of many candidates (background job)
+    - POST   /api/candidates/import/      -> Import candidates (background job)
+    - POST   /api/candidates/export/      -> Export candidates to CSV (background job)
+    - GET    /api/candidates/analytics/   -> Candidate counts grouped by status, position and date
     """
     
-    queryset = Candidate.objects.all()
+    queryset = Candidate.objects.filter(is_archived=False)
     serializer_class = CandidateSerializer
     permission_classes = [IsAuthenticated]
     
     # Enable filtering, searching, and ordering
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     
-    # Filter by status
-    filterset_fields = ['status']
+    # Filter by status and position name
+    filterset_class = CandidateFilter
     
     # Search by name and email
-    search_fields = ['name', 'email']
+    search_fields = SEARCH_FIELDS
     
     # Allow ordering by created_at and name
     ordering_fields = ['created_at', 'name']
     ordering = ['-created_at']  # Default ordering
     
+    # Throttle scopes of actions that are not plain reads or writes
+    throttle_scopes = {
+        'bulk_status': 'bulk',
+        'import_candidates': 'bulk',
+        'export': 'export',
+    }
+    
     def get_serializer_class(self):
         """
         Use different serializers for different actions
@@ -141,6 +246,12 @@ class CandidateViewSet(viewsets.ModelViewSet):
             return CandidateListSerializer
         elif self.action == 'update_status':
             return CandidateStatusSerializer
+        elif self.action == 'bulk_status':
+            return CandidateBulkStatusSerializer
+        elif self.action == 'import_candidates':
+            return CandidateImportSerializer
+        elif self.action == 'export':
+            return CandidateExportSerializer
         return CandidateSerializer
     
     def list(self, request, *args, **kwargs):
@@ -152,16 +263,104 @@ class CandidateViewSet(viewsets.ModelViewSet):
         - page: page number for pagination
         - search: search by name or email
         - status: filter by status (Applied, Interview, Selected, Rejected)
+        - position: filter by position name (case insensitive)
+        - ids: comma separated ids, returns those candidates in the given
+          order instead of a page (other parameters are ignored)
+        - facets: comma separated facets (status, position_applied), adds
+          counts per value for the current search and filters as "facets"
+        """
+        if 'ids' in request.query_params:
+            return self.list_by_ids(request)
+        
+        facets = []
+        if request.query_params.get('facets'):
+            from .facets import parse_facets
+            try:
+                facets = parse_facets(request.query_params['facets'])
+            except ValueError as e:
+                return Response(
+                    {'error': 'Invalid input', 'details': {'facets': [str(e)]}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # Identical concurrent requests share one set of queries
+        data = coalesce(request, lambda: self.list_data(request, facets), 'list')
+        return Response(copy.copy(data))
+    
+    def list_data(self, request, facets):
+        """
+        Page (or full list) of candidates plus the requested facets
         """
         queryset = self.filter_queryset(self.get_queryset())
         
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            data = self.get_paginated_response(serializer.data).data
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            data = {'results': serializer.data} if facets else serializer.data
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        if facets:
+            from .facets import get_facets
+            data['facets'] = get_facets(self, request, facets)
+        return data
+    
+    def list_by_ids(self, request):
+        """
+        Fetch several candidates with a single IN query
+        GET /api/candidates/?ids=3,1,2
+        
+        Response:
+        {
+            "count": int,
+            "results": [...],   # full candidate data, in the requested order
+            "missing": [int]    # requested ids that do not exist
+        }
+        """
+        from .batch import get_setting as get_batch_setting
+        
+        try:
+            ids = [int(value) for value in request.query_params['ids'].split(',') if value.strip()]
+        except ValueError:
+            return Response(
+                {'error': 'Invalid input', 'details': {'ids': ['Ids must be comma separated integers.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Drop repeated ids but keep the requested order
+        ids = list(dict.fromkeys(ids))
+        max_ids = get_batch_setting('MAX_IDS')
+        if not ids or len(ids) > max_ids:
+            return Response(
+                {'error': 'Invalid input', 'details': {'ids': [f'Provide between 1 and {max_ids} ids.']}},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        candidates = self.get_queryset().in_bulk(ids)
+        serializer = CandidateSerializer(
+            [candidates[pk] for pk in ids if pk in candidates],
+            many=True,
+            context=self.get_serializer_context()
+        )
+        
+        return Response({
+            'count': len(serializer.data),
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in candidates]
+        })
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve single candidate
+        GET /api/candidates/{id}/
+        """
+        data = coalesce(
+            request,
+            lambda: self.get_serializer(self.get_object()).data,
+            'retrieve', kwargs[self.lookup_field]
+        )
+        return Response(copy.copy(data))
     
     def create(self, request, *args, **kwargs):
         """
@@ -178,10 +377,15 @@ class CandidateViewSet(viewsets.ModelViewSet):
         
         self.perform_create(serializer)
         
+        # Flag likely duplicates (same phone, similar name, same email local part)
+        from .duplicates import find_candidate_duplicates
+        duplicates, _ = find_candidate_duplicates(serializer.instance)
+        
         return Response(
             {
                 'message': 'Candidate created successfully',
-                'data': serializer.data
+                'data': serializer.data,
+                'possible_duplicates': duplicates
             },
             status=status.HTTP_201_CREATED
         )
@@ -247,4 +451,192 @@ class CandidateViewSet(viewsets.ModelViewSet):
         return Response({
             'message': f'Status updated to {serializer.data["status"]}',
             'data': serializer.data
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        Update the status of many candidates in the background
+        POST /api/candidates/bulk-status/
+        
+        Request body:
+        {
+            "ids": [1, 2, 3],
+            "status": "Interview" | "Selected" | "Rejected" | "Applied"
+        }
+        
+        Responds with 202 and the queued job, poll /api/jobs/{id}/ for progress
+        """
+        serializer = CandidateBulkStatusSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = enqueue('bulk_update_status', serializer.validated_data, request.user)
+        return job_accepted_response(job, 'Status update queued')
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_candidates(self, request):
+        """
+        Import candidates in the background
+        POST /api/candidates/import/
+        
+        Request body:
+        {
+            "rows": [{"name": ..., "email": ..., "phone": ..., "position_applied": ..., "status": ...}]
+        }
+        
+        Each row is validated like POST /api/candidates/, invalid rows are
+        reported in the job result
+        """
+        serializer = CandidateImportSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = enqueue('import_candidates', serializer.validated_data, request.user)
+        return job_accepted_response(job, 'Import queued')
+    
+    @action(detail=False, methods=['post'])
+    def export(self, request):
+        """
+        Export candidates to CSV in the background
+        POST /api/candidates/export/
+        
+        Request body (optional filters, same as the list endpoint):
+        {
+            "status": "Applied",
+            "position": "Backend Developer",
+            "search": "john"
+        }
+        
+        Download the file from /api/jobs/{id}/download/ once the job succeeded
+        """
+        serializer = CandidateExportSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Validation failed', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        job = enqueue('export_candidates', serializer.validated_data, request.user)
+        return job_accepted_response(job, 'Export queued')
+    
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Candidate counts for reports, answered from the in-memory columnar
+        snapshot (see candidates/analytics.py), which may lag the database
+        by a few seconds
+        GET /api/candidates/analytics/
+        
+        Query parameters:
+        - group_by: comma separated fields (status, position_applied)
+        - bucket: day, week or month of the creation date
+        - status, position: filters, like the list endpoint
+        - created_after, created_before: creation date range (inclusive)
+        
+        Response:
+        {
+            "group_by": ["position_applied"],
+            "bucket": "week",
+            "results": [{"position_applied": ..., "bucket": "2025-01-06", "count": 12}],
+            "snapshot": {"rows": int, "refreshed_at": ...}
+        }
+        """
+        from . import analytics
+        
+        serializer = CandidateAnalyticsSerializer(data=request.query_params)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Invalid input', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        params = serializer.validated_data
+        snapshot = analytics.get_snapshot()
+        position = params.get('position')
+        position_id = get_position_id(position) if position else None
+        
+        if position and position_id is None:
+            results = []
+        else:
+            results = snapshot.query(
+                group_by=params['group_by'],
+                bucket=params.get('bucket'),
+                status=params.get('status'),
+                position_id=position_id,
+                since=analytics.day_start(params['created_after']) if 'created_after' in params else None,
+                until=analytics.day_start(params['created_before'] + timedelta(days=1)) if 'created_before' in params else None,
+            )
+        
+        return Response({
+            'group_by': params['group_by'],
+            'bucket': params.get('bucket'),
+            'results': results,
+            'snapshot': {
+                'rows': len(snapshot),
+                'refreshed_at': datetime.fromtimestamp(snapshot.refreshed_at, tz=dt_timezone.utc),
+            },
+        }, status=status.HTTP_200_OK)
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for checking background jobs
+    
+    Endpoints:
+    - GET /api/jobs/                -> List jobs queued by the current user
+    - GET /api/jobs/{id}/           -> Job status, progress and result
+    - GET /api/jobs/{id}/download/  -> Download the CSV of a finished export
+    """
+    
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['kind', 'status']
+    ordering_fields = ['created_at']
+    
+    def get_queryset(self):
+        """
+        Users only see their own jobs, staff see all of them
+        """
+        queryset = Job.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Download the file produced by an export job
+        GET /api/jobs/{id}/download/
+        """
+        job = self.get_object()
+        
+        if job.kind != 'export_candidates' or job.status != Job.SUCCEEDED:
+            return Response(
+                {'error': 'No finished export for this job'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        path = settings.EXPORT_ROOT / job.result['file']
+        if not path.exists():
+            return Response(
+                {'error': 'Export file no longer exists'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=job.result['file'],
+            content_type='text/csv'
+        )